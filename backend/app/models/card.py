@@ -1,6 +1,6 @@
 from datetime import datetime
 import uuid
-from sqlalchemy import Column, String, DateTime
+from sqlalchemy import Column, String, DateTime, Index
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.orm import relationship
 from app.services.database.postgres.postgres import Base
@@ -14,6 +14,8 @@ class Card(Base):
         String, unique=True, index=True, nullable=False
     )  # External card ID (e.g. "pokemon-base1-1")
     variant = Column(String, nullable=False)
+    # License key (e.g. "pokemon", "magic")
+    license = Column(String, nullable=False)
     # Full image URL stored at insert time
     card_image = Column(String, nullable=True)
     # Extension code (e.g. "base1", "lea")
@@ -26,3 +28,21 @@ class Card(Base):
 
     # Relationships
     collections = relationship("Collection", back_populates="card")
+
+    __table_args__ = (
+        Index("ix_cards_extension_license", "extension_id", "license"),
+    )
+
+
+def card_license(card_id: str) -> str:
+    # "pokemon-base1-1" -> "pokemon"
+    return card_id.split("-")[0]
+
+
+def card_extension(card_id: str) -> str | None:
+    # Only Pokémon ids embed the extension ("pokemon-base1-1"),
+    # Magic ids wrap a Scryfall uuid
+    parts = card_id.split("-")
+    if parts[0] == "pokemon" and len(parts) > 2:
+        return "-".join(parts[1:-1])
+    return None
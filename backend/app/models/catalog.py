@@ -0,0 +1,41 @@
+from datetime import datetime
+from sqlalchemy import Boolean, Column, DateTime, Index, Integer, String
+from sqlalchemy.dialects.postgresql import JSONB
+from app.services.database.postgres.postgres import Base
+
+
+class CatalogExtension(Base):
+    __tablename__ = "catalog_extensions"
+
+    # License key (e.g. "magic", "pokemon")
+    license = Column(String, primary_key=True)
+    # Upstream extension code (e.g. "base1", "khm")
+    extension_id = Column(String, primary_key=True)
+    name = Column(String, nullable=True)
+    # Order of the extension in the upstream listing
+    position = Column(Integer, nullable=False, default=0)
+    # Raw upstream object, standardized at read time
+    payload = Column(JSONB, nullable=False)
+    synced_at = Column(DateTime, default=datetime.now, nullable=False)
+
+
+class CatalogCard(Base):
+    __tablename__ = "catalog_cards"
+
+    license = Column(String, primary_key=True)
+    extension_id = Column(String, primary_key=True)
+    # Card number within the extension (collector number / localId)
+    card_number = Column(String, primary_key=True)
+    name = Column(String, nullable=True)
+    # Order of the card in the upstream listing
+    position = Column(Integer, nullable=False, default=0)
+    # False when the payload is a list summary, not the full card
+    detailed = Column(Boolean, nullable=False, default=False)
+    # Raw upstream object, standardized at read time
+    payload = Column(JSONB, nullable=False)
+    synced_at = Column(DateTime, default=datetime.now, nullable=False)
+
+    __table_args__ = (
+        Index("ix_catalog_cards_extension_name", "license", "extension_id",
+              "name"),
+    )
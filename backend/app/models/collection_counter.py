@@ -0,0 +1,20 @@
+from sqlalchemy import BigInteger, Column, ForeignKey, String
+from sqlalchemy.dialects.postgresql import UUID
+from app.services.database.postgres.postgres import Base
+
+
+# Running totals of a user's collection, kept in step with
+# collections by CollectionService (see services/collections/counters)
+class CollectionCounter(Base):
+    __tablename__ = "collection_counters"
+
+    user_id = Column(
+        UUID(as_uuid=True),
+        ForeignKey("users.id", ondelete="CASCADE"),
+        primary_key=True,
+    )
+    # "total", "license" or "variant"
+    scope = Column(String, primary_key=True)
+    # License or variant name, empty for the total
+    key = Column(String, primary_key=True, default="")
+    value = Column(BigInteger, nullable=False, default=0)
@@ -1,6 +1,14 @@
 from datetime import datetime
 import uuid
-from sqlalchemy import Column, Integer, DateTime, ForeignKey, String
+from sqlalchemy import (
+    Column,
+    DateTime,
+    ForeignKey,
+    Index,
+    Integer,
+    String,
+    UniqueConstraint,
+)
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.orm import relationship
 from app.services.database.postgres.postgres import Base
@@ -25,3 +33,15 @@ class Collection(Base):
     # Relations
     user = relationship("User", back_populates="collections")
     card = relationship("Card", back_populates="collections")
+
+    __table_args__ = (
+        # One entry per card and variant, target of ON CONFLICT upserts
+        UniqueConstraint(
+            "user_id",
+            "card_id",
+            "variant",
+            name="uq_collections_user_card_variant",
+        ),
+        # Most recent first listings and keyset pagination
+        Index("ix_collections_user_updated", "user_id", "updated_at", "id"),
+    )
@@ -1,11 +1,12 @@
 from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
+from starlette.concurrency import run_in_threadpool
 from app.models import user as user_model
-from app.services.database.postgres.postgres import get_postgres
+from app.services.database.postgres.postgres import get_postgres_async
 from starlette.responses import JSONResponse
 from app.schemas.user import UserDelete
 from app.routers.auth.password import verify_password
-from app.routers.auth.get_user import get_current_user
+from app.routers.auth.get_user import get_current_user_async
 
 router = APIRouter(prefix="", tags=["delete_account"])
 
@@ -20,8 +21,8 @@ async def get_delete_account():
 @router.delete("/delete_account")
 async def delete_account(
     credentials: UserDelete,
-    current_user: user_model.User = Depends(get_current_user),
-    db: Session = Depends(get_postgres),
+    current_user: user_model.User = Depends(get_current_user_async),
+    db: AsyncSession = Depends(get_postgres_async),
 ):
 
     # Check user email
@@ -31,16 +32,18 @@ async def delete_account(
         )
 
     # Check user password
-    if not verify_password(credentials.password, current_user.password):
+    if not await run_in_threadpool(
+        verify_password, credentials.password, current_user.password
+    ):
         raise HTTPException(status_code=401, detail="Invalid credentials")
 
     # Delete account
     try:
         user_id_str = str(current_user.id)
-        db.delete(current_user)
-        db.commit()
+        await db.delete(current_user)
+        await db.commit()
     except Exception:
-        db.rollback()
+        await db.rollback()
         raise HTTPException(
             status_code=500, detail="Database error during deletion"
         )
@@ -1,22 +1,26 @@
 from fastapi import Depends, HTTPException, Request
 from uuid import UUID
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 from app.models import user as user_model
-from app.services.database.postgres.postgres import get_postgres
+from app.services.database.postgres.postgres import (
+    get_postgres,
+    get_postgres_async,
+)
 from app.services.cookies import session as session_manager
 
 sm_instance = session_manager.SessionManager()
 
 
-def get_current_user(request: Request, db: Session = Depends(get_postgres)):
-
-    # Get session id
+def _session_id(request: Request) -> str:
     session_id = request.cookies.get("session_id")
     if not session_id:
         raise HTTPException(status_code=401, detail="Not authenticated")
+    return session_id
+
 
-    # Get session data
-    session = sm_instance.read_session(session_id)
+def _session_user_id(session: dict | None) -> UUID:
     if not session:
         raise HTTPException(status_code=401, detail="Session not found")
 
@@ -24,12 +28,26 @@ def get_current_user(request: Request, db: Session = Depends(get_postgres)):
 
     try:
         if isinstance(user_id_val, int):
-            clean_user_id = UUID(int=user_id_val)
-        else:
-            clean_user_id = UUID(str(user_id_val))
+            return UUID(int=user_id_val)
+        return UUID(str(user_id_val))
     except ValueError:
         raise HTTPException(status_code=401, detail="Invalid user ID format")
 
+
+def get_session_user_id(request: Request) -> UUID:
+    session_id = _session_id(request)
+    return _session_user_id(sm_instance.read_session(session_id))
+
+
+async def get_session_user_id_async(request: Request) -> UUID:
+    # Redis read on the async client, the event loop keeps serving
+    session_id = _session_id(request)
+    return _session_user_id(await sm_instance.read_session_async(session_id))
+
+
+def get_current_user(request: Request, db: Session = Depends(get_postgres)):
+    clean_user_id = get_session_user_id(request)
+
     user = (
         db.query(user_model.User)
         .filter(user_model.User.id == clean_user_id)
@@ -40,3 +58,18 @@ def get_current_user(request: Request, db: Session = Depends(get_postgres)):
         raise HTTPException(status_code=401, detail="User not found")
 
     return user
+
+
+async def get_current_user_async(
+    request: Request, db: AsyncSession = Depends(get_postgres_async)
+):
+    clean_user_id = await get_session_user_id_async(request)
+
+    user = await db.scalar(
+        select(user_model.User).where(user_model.User.id == clean_user_id)
+    )
+
+    if not user:
+        raise HTTPException(status_code=401, detail="User not found")
+
+    return user
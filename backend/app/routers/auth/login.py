@@ -1,8 +1,10 @@
 import os
 from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from starlette.concurrency import run_in_threadpool
 from app.models import user as user_model
-from app.services.database.postgres.postgres import get_postgres
+from app.services.database.postgres.postgres import get_postgres_async
 from app.schemas.user import UserLogin
 from starlette.responses import JSONResponse
 from app.routers.auth.password import verify_password
@@ -20,21 +22,27 @@ async def get_login():
 
 @router.post("/login")
 async def post_login(
-    credentials: UserLogin, db: Session = Depends(get_postgres)
+    credentials: UserLogin, db: AsyncSession = Depends(get_postgres_async)
 ):
     # Get user by email
-    user = (
-        db.query(user_model.User)
-        .filter(user_model.User.email == credentials.email)
-        .first()
+    user = await db.scalar(
+        select(user_model.User).where(
+            user_model.User.email == credentials.email
+        )
     )
 
-    if not user or not verify_password(credentials.password, user.password):
+    # bcrypt is slow on purpose, keep it off the event loop
+    if not user or not await run_in_threadpool(
+        verify_password, credentials.password, user.password
+    ):
         raise HTTPException(status_code=401, detail="Invalid credentials")
 
     # Create new session
     try:
-        session_data = sm_instance.create_session(user.id)
+        # Blocking redis-py calls, run them off the event loop
+        session_data = await run_in_threadpool(
+            sm_instance.create_session, user.id
+        )
         session_id = session_data["session_id"]
         message = "Login successful"
         status_code = 201
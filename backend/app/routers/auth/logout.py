@@ -1,5 +1,6 @@
 import app.services.cookies.session as session_manager
 from fastapi import APIRouter, HTTPException, Request
+from starlette.concurrency import run_in_threadpool
 from starlette.responses import JSONResponse
 
 session_manager_instance = session_manager.SessionManager()
@@ -24,7 +25,9 @@ async def post_logout(request: Request):
 
     # Delete session
     try:
-        session_manager_instance.delete_session(session_token)
+        await run_in_threadpool(
+            session_manager_instance.delete_session, session_token
+        )
     except Exception:
         raise HTTPException(status_code=500, detail="Error deleting session")
 
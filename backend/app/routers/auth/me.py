@@ -1,13 +1,15 @@
 from fastapi import APIRouter, Depends
 from app.models import user as user_model
-from app.routers.auth.get_user import get_current_user
+from app.routers.auth.get_user import get_current_user_async
 
 
 router = APIRouter(prefix="", tags=["me"])
 
 
 @router.get("/me")
-async def get_me(user: user_model.User = Depends(get_current_user)):
+async def get_me(
+    user: user_model.User = Depends(get_current_user_async),
+):
     return {
         "user_id": str(user.id),
         "username": user.username,
@@ -1,9 +1,11 @@
 import bcrypt
 from datetime import datetime
 from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from starlette.concurrency import run_in_threadpool
 from app.models import user as user_model
-from app.services.database.postgres.postgres import get_postgres
+from app.services.database.postgres.postgres import get_postgres_async
 from app.schemas.user import UserCreate
 from starlette.responses import JSONResponse
 
@@ -25,18 +27,18 @@ async def get_register():
 
 @router.post("/register")
 async def post_register(
-    user_data: UserCreate, db: Session = Depends(get_postgres)
+    user_data: UserCreate, db: AsyncSession = Depends(get_postgres_async)
 ):
     # Check if user already exists
-    db_username = (
-        db.query(user_model.User)
-        .filter(user_model.User.username == user_data.username)
-        .first()
+    db_username = await db.scalar(
+        select(user_model.User).where(
+            user_model.User.username == user_data.username
+        )
     )
-    db_user_email = (
-        db.query(user_model.User)
-        .filter(user_model.User.email == user_data.email)
-        .first()
+    db_user_email = await db.scalar(
+        select(user_model.User).where(
+            user_model.User.email == user_data.email
+        )
     )
     if db_username:
         raise HTTPException(
@@ -47,7 +49,9 @@ async def post_register(
         raise HTTPException(status_code=409, detail="Email already registered")
 
     # Hash the password
-    hashed_password = hash_password(user_data.password)
+    hashed_password = await run_in_threadpool(
+        hash_password, user_data.password
+    )
 
     # Create a new user
     new_user = user_model.User(
@@ -60,8 +64,8 @@ async def post_register(
 
     # Save to Postgres
     db.add(new_user)
-    db.commit()
-    db.refresh(new_user)
+    await db.commit()
+    await db.refresh(new_user)
 
     # Create response with JSON
     response = JSONResponse(
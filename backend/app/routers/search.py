@@ -1,8 +1,10 @@
 import json
 from pathlib import Path
 from fastapi import APIRouter, HTTPException
+from fastapi.responses import StreamingResponse
 from app.services import pokemon_service
 from app.services import magic_service
+from app.services.cache.search_cache import search_cache
 
 router = APIRouter(tags=["search"])
 
@@ -26,14 +28,7 @@ async def get_licenses():
     return license_data
 
 
-@router.get("/search/{license}")
-@router.get("/search/{license}/{extension}")
-@router.get("/search/{license}/{extension}/{card}")
-async def search(
-    license: str,
-    extension: str | None = None,
-    card: str | None = None,
-):
+def get_service(license: str):
     license_key = license.lower()
 
     # Validate license
@@ -52,9 +47,75 @@ async def search(
             detail=f"Service not configured for license: {license}",
         )
 
-    # Fetch + standardise
+    return license_key, service
+
+
+# Declared before the card route so "stream" is not read as a card
+@router.get("/search/{license}/{extension}/stream")
+async def search_stream(license: str, extension: str):
+    """Stream the cards of an extension as NDJSON, one card per line."""
+    license_key, service = get_service(license)
+
+    cached = await search_cache.get_cached(
+        license_key,
+        extension,
+        None,
+        lambda: service.fetch_and_standardized(extension, None),
+    )
+    cards = (
+        _iter_list(cached)
+        if cached is not None
+        else service.stream_standardized(extension)
+    )
+
+    # Wait for the first card so errors and misses keep their status
+    try:
+        first = await anext(cards, None)
+    except Exception as e:
+        raise HTTPException(
+            status_code=500, detail=f"Internal error: {str(e)}"
+        )
+
+    if first is None:
+        raise HTTPException(status_code=404, detail="No data found")
+
+    async def generate():
+        collected = [first]
+        yield json.dumps(first) + "\n"
+        async for card in cards:
+            collected.append(card)
+            yield json.dumps(card) + "\n"
+
+        # Cache the full listing once the stream completed
+        if cached is None:
+            await search_cache.store(license_key, extension, None, collected)
+
+    return StreamingResponse(generate(), media_type="application/x-ndjson")
+
+
+async def _iter_list(items: list):
+    for item in items:
+        yield item
+
+
+@router.get("/search/{license}")
+@router.get("/search/{license}/{extension}")
+@router.get("/search/{license}/{extension}/{card}")
+async def search(
+    license: str,
+    extension: str | None = None,
+    card: str | None = None,
+):
+    license_key, service = get_service(license)
+
+    # Fetch + standardise, served from Redis when cached
     try:
-        result = await service.fetch_and_standardized(extension, card)
+        result = await search_cache.get_or_fetch(
+            license_key,
+            extension,
+            card,
+            lambda: service.fetch_and_standardized(extension, card),
+        )
     except Exception as e:
         raise HTTPException(
             status_code=500, detail=f"Internal error: {str(e)}"
@@ -1,4 +1,6 @@
 from fastapi import APIRouter
+from app.services.database.postgres.postgres import pool_status
+from app.services.external.single_flight import upstream_flight
 
 router = APIRouter(prefix="", tags=["status"])
 
@@ -8,3 +10,15 @@ async def get_status():
     return {
         "title": "Status",
     }
+
+
+@router.get("/status/upstream")
+async def get_upstream_status():
+    """Return single-flight counters for upstream API calls."""
+    return {"single_flight": upstream_flight.stats()}
+
+
+@router.get("/status/database")
+async def get_database_status():
+    """Return Postgres pool statistics for this worker."""
+    return pool_status()
@@ -1,109 +1,203 @@
-from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
-from app.schemas.collection import CollectionCreate
-from app.services.database.postgres.postgres import get_postgres
-from app.routers.auth.get_user import get_current_user
+import os
+from datetime import date
+from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.responses import StreamingResponse
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.schemas.collection import CollectionBatch, CollectionCreate
+from app.services.database.postgres.postgres import get_postgres_async
+from app.routers.auth.get_user import get_current_user_async
 from app.models import user as user_model
-from app.services.collections.collection import CollectionService
+from app.services.collections.collection import (
+    AsyncCollectionService,
+    stream_owned_cards,
+)
+from app.services.collections.export import (
+    csv_lines,
+    gzip_chunks,
+    ndjson_lines,
+)
 
 router = APIRouter(prefix="", tags=["vault"])
 
+# Page size of /vault/cards when paginated, and its upper bound
+VAULT_PAGE_SIZE = int(os.environ.get("VAULT_PAGE_SIZE", "100"))
+VAULT_PAGE_MAX = int(os.environ.get("VAULT_PAGE_MAX", "500"))
+
 
 @router.get("/vault")
 async def get_vault(
-    db: Session = Depends(get_postgres),
-    user: user_model.User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_postgres_async),
+    user: user_model.User = Depends(get_current_user_async),
 ):
     """Return total card count for the current user."""
-    service = CollectionService(db)
-    total_cards = service.get_total_cards(user.id)
+    service = AsyncCollectionService(db)
+    total_cards = await service.get_total_cards(user.id)
     return {"total_cards": total_cards}
 
 
 @router.get("/vault/licenses")
 async def get_vault_licenses(
-    db: Session = Depends(get_postgres),
-    user: user_model.User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_postgres_async),
+    user: user_model.User = Depends(get_current_user_async),
 ):
     """Return card count grouped by license."""
-    service = CollectionService(db)
-    return service.get_total_by_license(user.id)
+    service = AsyncCollectionService(db)
+    return await service.get_total_by_license(user.id)
 
 
 @router.get("/vault/stats")
 async def get_vault_stats(
-    db: Session = Depends(get_postgres),
-    user: user_model.User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_postgres_async),
+    user: user_model.User = Depends(get_current_user_async),
 ):
     """Return full collection statistics for the current user."""
-    service = CollectionService(db)
-    return service.get_stats(user.id)
+    service = AsyncCollectionService(db)
+    return await service.get_stats(user.id)
 
 
 @router.get("/vault/recent")
 async def get_vault_recent(
-    db: Session = Depends(get_postgres),
-    user: user_model.User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_postgres_async),
+    user: user_model.User = Depends(get_current_user_async),
 ):
     """Return the 10 most recently added cards."""
-    service = CollectionService(db)
-    return service.get_recent_cards(user.id)
+    service = AsyncCollectionService(db)
+    return await service.get_recent_cards(user.id)
 
 
 @router.get("/vault/cards")
 async def get_vault_cards(
-    db: Session = Depends(get_postgres),
-    user: user_model.User = Depends(get_current_user),
+    limit: int | None = Query(None, ge=1, le=VAULT_PAGE_MAX),
+    cursor: str | None = None,
+    license: str | None = None,
+    extension: str | None = None,
+    db: AsyncSession = Depends(get_postgres_async),
+    user: user_model.User = Depends(get_current_user_async),
+):
+    """Return the cards owned by the user.
+
+    Without parameters: every card, one entry per card. With limit,
+    cursor, license or extension: a keyset page of entries (one per
+    card and variant) and the cursor of the next page.
+    """
+    service = AsyncCollectionService(db)
+    if limit is None and cursor is None and not (license or extension):
+        return await service.get_all_owned_cards(user.id)
+
+    try:
+        return await service.get_owned_cards_page(
+            user.id,
+            limit or VAULT_PAGE_SIZE,
+            cursor=cursor,
+            license_name=license,
+            extension_id=extension,
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+# Declared before the card route so these paths are not card ids
+@router.get("/vault/cards/stream")
+async def stream_vault_cards(
+    license: str | None = None,
+    extension: str | None = None,
+    user: user_model.User = Depends(get_current_user_async),
 ):
-    """Return all cards owned by the user."""
-    service = CollectionService(db)
-    return service.get_all_owned_cards(user.id)
+    """Stream every owned entry as NDJSON, one card variant per line."""
+    entries = stream_owned_cards(user.id, license, extension)
+    return StreamingResponse(
+        ndjson_lines(entries), media_type="application/x-ndjson"
+    )
 
 
+@router.get("/vault/export")
+async def export_vault(
+    format: str = Query("csv", pattern="^(csv|ndjson)$"),
+    gzip: bool = False,
+    user: user_model.User = Depends(get_current_user_async),
+):
+    """Download the whole collection as CSV or NDJSON, gzipped or not.
+
+    Rows are streamed from a server-side cursor, so memory stays flat
+    whatever the size of the collection.
+    """
+    entries = stream_owned_cards(user.id)
+    if format == "csv":
+        body, media_type = csv_lines(entries), "text/csv"
+    else:
+        body, media_type = ndjson_lines(entries), "application/x-ndjson"
+
+    filename = f"card_vault_{date.today().isoformat()}.{format}"
+    if gzip:
+        body, media_type = gzip_chunks(body), "application/gzip"
+        filename += ".gz"
+
+    return StreamingResponse(
+        body,
+        media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'},
+    )
+
+
+@router.get("/vault/extension/{extension_id}")
 async def get_vault_extension(
     extension_id: str,
-    db: Session = Depends(get_postgres),
-    user: user_model.User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_postgres_async),
+    user: user_model.User = Depends(get_current_user_async),
 ):
     """Return owned card IDs and count for a given extension."""
-    service = CollectionService(db)
-    return service.get_owned_by_extension(user.id, extension_id)
+    service = AsyncCollectionService(db)
+    return await service.get_owned_by_extension(user.id, extension_id)
 
 
 @router.get("/vault/{card_id:path}")
 async def get_vault_card(
     card_id: str,
-    db: Session = Depends(get_postgres),
-    user: user_model.User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_postgres_async),
+    user: user_model.User = Depends(get_current_user_async),
 ):
     """Return owned quantities per variant for a specific card."""
-    service = CollectionService(db)
-    return service.get_card_quantities(user.id, card_id)
+    service = AsyncCollectionService(db)
+    return await service.get_card_quantities(user.id, card_id)
 
 
 @router.post("/vault")
 async def post_vault(
     collection_data: CollectionCreate,
-    db: Session = Depends(get_postgres),
-    user: user_model.User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_postgres_async),
+    user: user_model.User = Depends(get_current_user_async),
 ):
     """Add or update a card in the user's collection."""
-    service = CollectionService(db)
-    entry = service.add_card_to_collection(
-        user_id=user.id,
-        external_card_id=collection_data.card_id,
-        variant=collection_data.variant,
-        quantity=collection_data.quantity,
-        card_image=collection_data.card_image,
-        extension_id=collection_data.extension_id,
-        card_number=collection_data.card_number,
-        card_name=collection_data.card_name,
-    )
-
-    if not entry and collection_data.quantity > 0:
-        raise HTTPException(
-            status_code=404,
-            detail=f"Card '{collection_data.card_id}' not found in database.",
+    service = AsyncCollectionService(db)
+    try:
+        await service.add_card_to_collection(
+            user_id=user.id,
+            external_card_id=collection_data.card_id,
+            variant=collection_data.variant,
+            quantity=collection_data.quantity,
+            card_image=collection_data.card_image,
+            extension_id=collection_data.extension_id,
+            card_number=collection_data.card_number,
+            card_name=collection_data.card_name,
         )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
 
     return {"message": "Success"}
+
+
+@router.post("/vault/batch")
+async def post_vault_batch(
+    batch: CollectionBatch,
+    db: AsyncSession = Depends(get_postgres_async),
+    user: user_model.User = Depends(get_current_user_async),
+):
+    """Add or remove many cards in one transaction.
+
+    Quantities of the same card and variant are summed. Returns one
+    result per item, in order: the entry's new quantity, or why its
+    change was refused. More than VAULT_BATCH_MAX_ITEMS items are
+    refused by the schema with a 422.
+    """
+    service = AsyncCollectionService(db)
+    return {"results": await service.apply_batch(user.id, batch.items)}
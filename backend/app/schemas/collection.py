@@ -1,6 +1,10 @@
+import os
 from datetime import datetime
 from uuid import UUID
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
+
+# Largest number of items accepted by /vault/batch
+VAULT_BATCH_MAX_ITEMS = int(os.environ.get("VAULT_BATCH_MAX_ITEMS", "2000"))
 
 
 class CollectionCreate(BaseModel):
@@ -13,6 +17,11 @@ class CollectionCreate(BaseModel):
     card_name: str | None = None  # Card name sent from frontend
 
 
+class CollectionBatch(BaseModel):
+    # Checked while validating, before any item reaches the service
+    items: list[CollectionCreate] = Field(max_length=VAULT_BATCH_MAX_ITEMS)
+
+
 class CollectionRead(BaseModel):
     id: UUID
     user_id: UUID
@@ -0,0 +1,140 @@
+import asyncio
+import json
+import os
+import time
+from typing import Any, Awaitable, Callable
+import app.services.database.redis.redis as redis_client
+
+# Freshness per payload kind, in seconds
+SEARCH_TTL_EXTENSIONS = int(os.environ.get("SEARCH_TTL_EXTENSIONS", "86400"))
+SEARCH_TTL_CARDS = int(os.environ.get("SEARCH_TTL_CARDS", "21600"))
+SEARCH_TTL_CARD = int(os.environ.get("SEARCH_TTL_CARD", "3600"))
+# How long a stale entry may still be served while it is refreshed
+SEARCH_STALE_TTL = int(os.environ.get("SEARCH_STALE_TTL", "86400"))
+
+KEY_PREFIX = "search:v1"
+
+
+class SearchCache:
+    def __init__(self):
+        self.redis_cache = redis_client.AsyncRedisCache()
+        self._refreshing: set[str] = set()
+        self._tasks: set[asyncio.Task] = set()
+
+    # Build the Redis key for a license/extension/card lookup
+    @staticmethod
+    def build_key(
+        license: str, extension: str | None = None, card: str | None = None
+    ) -> str:
+        return f"{KEY_PREFIX}:{license}:{extension or '-'}:{card or '-'}"
+
+    # Pick the freshness TTL matching the payload kind
+    @staticmethod
+    def ttl_for(extension: str | None = None, card: str | None = None) -> int:
+        if extension and card:
+            return SEARCH_TTL_CARD
+        if extension:
+            return SEARCH_TTL_CARDS
+        return SEARCH_TTL_EXTENSIONS
+
+    # Read a cached entry, Redis errors and timeouts count as a miss
+    async def read(self, key: str) -> dict | None:
+        try:
+            raw = await self.redis_cache.read_redis(key)
+        except RuntimeError as e:
+            print(f"Search cache unavailable: {e}")
+            return None
+
+        if not raw:
+            return None
+
+        try:
+            return json.loads(raw)
+        except ValueError:
+            return None
+
+    # Store a payload, kept in Redis for its TTL plus the stale window
+    async def write(self, key: str, data: Any, ttl: int) -> None:
+        entry = {"stored_at": time.time(), "data": data}
+        try:
+            await self.redis_cache.create_redis(
+                key, json.dumps(entry), ttl + SEARCH_STALE_TTL
+            )
+        except RuntimeError as e:
+            print(f"Search cache unavailable: {e}")
+
+    async def get_cached(
+        self,
+        license: str,
+        extension: str | None,
+        card: str | None,
+        loader: Callable[[], Awaitable[Any]],
+    ) -> Any:
+        # Return the cached payload or None, refreshing stale entries
+        key = self.build_key(license, extension, card)
+        ttl = self.ttl_for(extension, card)
+
+        entry = await self.read(key)
+        if entry is None:
+            return None
+
+        # Serve stale entries now, refresh them in the background
+        if time.time() - entry.get("stored_at", 0) >= ttl:
+            self._schedule_refresh(key, ttl, loader)
+        return entry.get("data")
+
+    async def store(
+        self,
+        license: str,
+        extension: str | None,
+        card: str | None,
+        data: Any,
+    ) -> None:
+        key = self.build_key(license, extension, card)
+        await self.write(key, data, self.ttl_for(extension, card))
+
+    async def get_or_fetch(
+        self,
+        license: str,
+        extension: str | None,
+        card: str | None,
+        loader: Callable[[], Awaitable[Any]],
+    ) -> Any:
+        cached = await self.get_cached(license, extension, card, loader)
+        if cached is not None:
+            return cached
+
+        data = await loader()
+        if data:
+            await self.store(license, extension, card, data)
+        return data
+
+    def _schedule_refresh(
+        self, key: str, ttl: int, loader: Callable[[], Awaitable[Any]]
+    ) -> None:
+        # Only one background refresh per key at a time
+        if key in self._refreshing:
+            return
+
+        self._refreshing.add(key)
+        task = asyncio.create_task(self._refresh(key, ttl, loader))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _refresh(
+        self, key: str, ttl: int, loader: Callable[[], Awaitable[Any]]
+    ) -> None:
+        try:
+            data = await loader()
+            if data:
+                await self.write(key, data, ttl)
+        except Exception as e:
+            print(f"Failed to refresh search cache key '{key}': {e}")
+        finally:
+            self._refreshing.discard(key)
+
+    async def close(self) -> None:
+        await self.redis_cache.close()
+
+
+search_cache = SearchCache()
@@ -0,0 +1,128 @@
+import os
+from typing import Any
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.orm import Session
+from starlette.concurrency import run_in_threadpool
+from app.models.catalog import CatalogCard, CatalogExtension
+from app.services.database.postgres import postgres
+
+CATALOG_ENABLED = os.environ.get("CATALOG_ENABLED", "true").lower() == "true"
+
+
+def normalize_extension(license: str, extension: str) -> str:
+    # Scryfall set codes are stored lowercase
+    return extension.lower() if license == "magic" else extension
+
+
+def find_extensions(db: Session, license: str) -> list:
+    # Return raw extension payloads in upstream order
+    rows = (
+        db.query(CatalogExtension.payload)
+        .filter(CatalogExtension.license == license)
+        .order_by(CatalogExtension.position)
+        .all()
+    )
+    return [row.payload for row in rows]
+
+
+def find_extension(db: Session, license: str, extension: str) -> Any:
+    row = (
+        db.query(CatalogExtension.payload)
+        .filter_by(license=license, extension_id=extension)
+        .first()
+    )
+    return row.payload if row else None
+
+
+def find_cards(db: Session, license: str, extension: str) -> list:
+    # Magic follows Scryfall's name order, others their upstream order
+    order = (
+        CatalogCard.name if license == "magic" else CatalogCard.position
+    )
+    rows = (
+        db.query(CatalogCard.payload)
+        .filter_by(license=license, extension_id=extension)
+        .order_by(order)
+        .all()
+    )
+    return [row.payload for row in rows]
+
+
+def find_card(db: Session, license: str, extension: str, card: str) -> Any:
+    # Only full card records can answer a single card lookup
+    row = (
+        db.query(CatalogCard.payload)
+        .filter_by(
+            license=license,
+            extension_id=extension,
+            card_number=card,
+            detailed=True,
+        )
+        .first()
+    )
+    return row.payload if row else None
+
+
+# ---------- Rebuild upstream-shaped responses ---------- #
+
+
+def _magic_response(
+    db: Session, extension: str | None, card: str | None
+) -> Any:
+    if extension and card:
+        return find_card(db, "magic", extension, card)
+    if extension:
+        cards = find_cards(db, "magic", extension)
+        if not cards:
+            return None
+        return {
+            "object": "list",
+            "total_cards": len(cards),
+            "has_more": False,
+            "data": cards,
+        }
+    extensions = find_extensions(db, "magic")
+    return {"object": "list", "data": extensions} if extensions else None
+
+
+def _pokemon_response(
+    db: Session, extension: str | None, card: str | None
+) -> Any:
+    if extension and card:
+        return find_card(db, "pokemon", extension, card)
+    if extension:
+        cards = find_cards(db, "pokemon", extension)
+        if not cards:
+            return None
+        set_data = find_extension(db, "pokemon", extension) or {}
+        return {**set_data, "id": extension, "cards": cards}
+    return find_extensions(db, "pokemon") or None
+
+
+RESPONSES = {
+    "magic": _magic_response,
+    "pokemon": _pokemon_response,
+}
+
+
+def _lookup(license: str, extension: str | None, card: str | None) -> Any:
+    if extension:
+        extension = normalize_extension(license, extension)
+    db = postgres.SessionLocal()
+    try:
+        return RESPONSES[license](db, extension, card)
+    finally:
+        db.close()
+
+
+async def lookup(
+    license: str, extension: str | None = None, card: str | None = None
+) -> Any:
+    # Return the upstream-shaped payload from the mirror, None on a miss
+    if not CATALOG_ENABLED or license not in RESPONSES:
+        return None
+    try:
+        return await run_in_threadpool(_lookup, license, extension, card)
+    except SQLAlchemyError as e:
+        print(f"Catalog lookup failed, using upstream: {e}")
+        return None
@@ -0,0 +1,282 @@
+"""Mirror the Scryfall and TCGdex catalogs into Postgres.
+
+Run from the backend directory:
+
+    python -m app.services.catalog.sync [--license magic|pokemon]
+
+Every source can be replaced by a local JSON file (--magic-bulk,
+--magic-sets, --pokemon-sets, --pokemon-cards), which keeps the job
+usable offline, e.g. with fixture files.
+"""
+
+import argparse
+import json
+import os
+import tempfile
+from datetime import datetime
+from typing import Iterable, Iterator
+import httpx
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.orm import Session
+from app.models.catalog import CatalogCard, CatalogExtension
+from app.services.database.postgres import postgres
+
+SCRYFALL_BULK_URL = "https://api.scryfall.com/bulk-data"
+SCRYFALL_SETS_URL = "https://api.scryfall.com/sets"
+TCGDEX_SETS_URL = "https://api.tcgdex.net/v2/en/sets"
+TCGDEX_CARDS_URL = "https://api.tcgdex.net/v2/en/cards"
+HEADERS = {"User-Agent": "CardVaultCatalog/1.0", "Accept": "application/json"}
+TIMEOUT = 60
+CHUNK_SIZE = 1000
+
+
+# ---------- Sources ---------- #
+
+
+def fetch_json(url: str):
+    response = httpx.get(url, headers=HEADERS, timeout=TIMEOUT)
+    response.raise_for_status()
+    return response.json()
+
+
+def download_magic_bulk() -> str:
+    # Find the "default_cards" bulk file and download it to disk
+    bulk_info = fetch_json(SCRYFALL_BULK_URL)
+    target = next(
+        item for item in bulk_info["data"] if item["type"] == "default_cards"
+    )
+
+    fd, path = tempfile.mkstemp(suffix=".json")
+    with os.fdopen(fd, "wb") as f:
+        with httpx.stream(
+            "GET", target["download_uri"], headers=HEADERS, timeout=TIMEOUT
+        ) as response:
+            response.raise_for_status()
+            for chunk in response.iter_bytes():
+                f.write(chunk)
+    return path
+
+
+def load_json(path: str):
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def iter_json_array(path: str) -> Iterator[dict]:
+    # Scryfall bulk files hold one object per line, read them lazily
+    with open(path, "r", encoding="utf-8") as f:
+        first = f.readline().strip()
+        if first != "[":
+            f.seek(0)
+            yield from json.load(f)
+            return
+
+        for line in f:
+            line = line.strip().rstrip(",")
+            if line and line != "]":
+                yield json.loads(line)
+
+
+# ---------- Upserts ---------- #
+
+
+def _chunks(rows: Iterable[dict], size: int = CHUNK_SIZE) -> Iterator[list]:
+    chunk = []
+    for row in rows:
+        chunk.append(row)
+        if len(chunk) >= size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def _upsert(db: Session, model, rows: Iterable[dict], keys: list) -> int:
+    count = 0
+    for chunk in _chunks(rows):
+        # A statement cannot touch the same row twice
+        unique = {tuple(row[k] for k in keys): row for row in chunk}
+        stmt = insert(model).values(list(unique.values()))
+        stmt = stmt.on_conflict_do_update(
+            index_elements=keys,
+            set_={
+                column: stmt.excluded[column]
+                for column in chunk[0]
+                if column not in keys
+            },
+        )
+        db.execute(stmt)
+        count += len(unique)
+    return count
+
+
+def _prune(db: Session, model, license: str, started_at: datetime) -> None:
+    # Drop entries that disappeared upstream since the last sync
+    db.query(model).filter(
+        model.license == license, model.synced_at < started_at
+    ).delete(synchronize_session=False)
+
+
+# ---------- Magic ---------- #
+
+
+def magic_extension_rows(sets: dict, synced_at: datetime) -> Iterator[dict]:
+    for position, extension in enumerate(sets.get("data", [])):
+        yield {
+            "license": "magic",
+            "extension_id": extension["code"].lower(),
+            "name": extension.get("name"),
+            "position": position,
+            "payload": extension,
+            "synced_at": synced_at,
+        }
+
+
+def magic_card_rows(
+    cards: Iterable[dict], synced_at: datetime
+) -> Iterator[dict]:
+    for position, card in enumerate(cards):
+        if card.get("object", "card") != "card":
+            continue
+        yield {
+            "license": "magic",
+            "extension_id": card["set"].lower(),
+            "card_number": card["collector_number"],
+            "name": card.get("name"),
+            "position": position,
+            "detailed": True,
+            "payload": card,
+            "synced_at": synced_at,
+        }
+
+
+def sync_magic(db: Session, sets: dict, cards: Iterable[dict]) -> dict:
+    started_at = datetime.now()
+    extensions = _upsert(
+        db,
+        CatalogExtension,
+        magic_extension_rows(sets, started_at),
+        ["license", "extension_id"],
+    )
+    total = _upsert(
+        db,
+        CatalogCard,
+        magic_card_rows(cards, started_at),
+        ["license", "extension_id", "card_number"],
+    )
+    _prune(db, CatalogExtension, "magic", started_at)
+    _prune(db, CatalogCard, "magic", started_at)
+    db.commit()
+    return {"extensions": extensions, "cards": total}
+
+
+# ---------- Pokemon ---------- #
+
+
+def _pokemon_extension_id(card: dict) -> str:
+    # "base1-4" with localId "4" belongs to extension "base1"
+    card_id, local_id = card["id"], str(card.get("localId", ""))
+    if local_id and card_id.endswith(f"-{local_id}"):
+        return card_id[: -len(local_id) - 1]
+    return card_id.rsplit("-", 1)[0]
+
+
+def pokemon_extension_rows(
+    sets: list, synced_at: datetime
+) -> Iterator[dict]:
+    for position, extension in enumerate(sets):
+        yield {
+            "license": "pokemon",
+            "extension_id": extension["id"],
+            "name": extension.get("name"),
+            "position": position,
+            "payload": extension,
+            "synced_at": synced_at,
+        }
+
+
+def pokemon_card_rows(cards: list, synced_at: datetime) -> Iterator[dict]:
+    for position, card in enumerate(cards):
+        yield {
+            "license": "pokemon",
+            "extension_id": _pokemon_extension_id(card),
+            "card_number": str(card.get("localId")),
+            "name": card.get("name"),
+            "position": position,
+            # List entries lack pricing, rarity, illustrator...
+            "detailed": "set" in card,
+            "payload": card,
+            "synced_at": synced_at,
+        }
+
+
+def sync_pokemon(db: Session, sets: list, cards: list) -> dict:
+    started_at = datetime.now()
+    extensions = _upsert(
+        db,
+        CatalogExtension,
+        pokemon_extension_rows(sets, started_at),
+        ["license", "extension_id"],
+    )
+    total = _upsert(
+        db,
+        CatalogCard,
+        pokemon_card_rows(cards, started_at),
+        ["license", "extension_id", "card_number"],
+    )
+    _prune(db, CatalogExtension, "pokemon", started_at)
+    _prune(db, CatalogCard, "pokemon", started_at)
+    db.commit()
+    return {"extensions": extensions, "cards": total}
+
+
+# ---------- Entry point ---------- #
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Sync the card catalog")
+    parser.add_argument("--license", choices=["magic", "pokemon"])
+    parser.add_argument("--magic-bulk", help="Scryfall default_cards file")
+    parser.add_argument("--magic-sets", help="Scryfall /sets JSON file")
+    parser.add_argument("--pokemon-sets", help="TCGdex /sets JSON file")
+    parser.add_argument("--pokemon-cards", help="TCGdex /cards JSON file")
+    args = parser.parse_args()
+
+    db = postgres.SessionLocal()
+
+    try:
+        if args.license in (None, "magic"):
+            print("Syncing Magic catalog")
+            sets = (
+                load_json(args.magic_sets)
+                if args.magic_sets
+                else fetch_json(SCRYFALL_SETS_URL)
+            )
+            bulk_path = args.magic_bulk or download_magic_bulk()
+            try:
+                result = sync_magic(db, sets, iter_json_array(bulk_path))
+            finally:
+                if not args.magic_bulk:
+                    os.remove(bulk_path)
+            print(f"Magic: {result}")
+
+        if args.license in (None, "pokemon"):
+            print("Syncing Pokemon catalog")
+            sets = (
+                load_json(args.pokemon_sets)
+                if args.pokemon_sets
+                else fetch_json(TCGDEX_SETS_URL)
+            )
+            cards = (
+                load_json(args.pokemon_cards)
+                if args.pokemon_cards
+                else fetch_json(TCGDEX_CARDS_URL)
+            )
+            result = sync_pokemon(db, sets, cards)
+            print(f"Pokemon: {result}")
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -1,9 +1,134 @@
+import base64
+import json
+import os
 from datetime import datetime
-from uuid import UUID
+from uuid import UUID, uuid4
+from sqlalchemy.dialects.postgresql import UUID as PG_UUID, insert
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
-from sqlalchemy import func
-from app.models.card import Card
+from sqlalchemy import (
+    JSON,
+    Integer,
+    String,
+    and_,
+    case,
+    column,
+    delete,
+    distinct,
+    func,
+    or_,
+    select,
+    true,
+    tuple_,
+    union_all,
+    update,
+    values,
+)
+from app.models.card import Card, card_extension, card_license
+from app.models.collection_counter import CollectionCounter
 from app.models.collections import Collection
+from app.services.collections import counters
+from app.services.database.postgres import postgres
+
+# Rows fetched per round trip by the server-side cursor of streams
+VAULT_STREAM_BATCH = int(os.environ.get("VAULT_STREAM_BATCH", "500"))
+
+# Card fields filled in when a later add knows them
+CARD_DETAILS = ("card_image", "extension_id", "card_number", "card_name")
+
+
+def _card_summary(card) -> dict:
+    # Display fields of a card (ORM object or row)
+    license_name = card.license
+
+    # Fallback for Pokémon cards
+    if license_name == "pokemon" and not card.extension_id:
+        parts = card.card_id.split("-")
+        fallback_card_number = parts[-1]
+        fallback_extension_id = "-".join(parts[1:-1])
+    else:
+        fallback_card_number = ""
+        fallback_extension_id = ""
+
+    return {
+        "card_id": card.card_id,
+        "card_name": card.card_name or "",
+        "card_number": card.card_number or fallback_card_number,
+        "extension_id": card.extension_id or fallback_extension_id,
+        "license": license_name,
+        "card_image": card.card_image or "",
+    }
+
+
+def owned_cards_query(
+    user_id: UUID,
+    license_name: str | None = None,
+    extension_id: str | None = None,
+):
+    # One row per owned card and variant, most recent first. Served
+    # by the (user_id, updated_at, id) index on collections
+    stmt = (
+        select(
+            Collection.id,
+            Collection.variant,
+            Collection.quantity,
+            Collection.updated_at,
+            Card.card_id,
+            Card.license,
+            Card.card_name,
+            Card.card_number,
+            Card.extension_id,
+            Card.card_image,
+        )
+        .join(Card, Card.id == Collection.card_id)
+        .where(Collection.user_id == user_id, Collection.quantity > 0)
+        .order_by(Collection.updated_at.desc(), Collection.id.desc())
+    )
+    if license_name:
+        stmt = stmt.where(Card.license == license_name)
+    if extension_id:
+        stmt = stmt.where(Card.extension_id == extension_id)
+    return stmt
+
+
+def owned_entry(row) -> dict:
+    return {
+        **_card_summary(row),
+        "variant": row.variant,
+        "quantity": row.quantity,
+        "updated_at": row.updated_at.isoformat(),
+    }
+
+
+def encode_cursor(row) -> str:
+    # Opaque position after the given row: (updated_at, id)
+    raw = json.dumps([row.updated_at.isoformat(), str(row.id)])
+    return base64.urlsafe_b64encode(raw.encode()).decode()
+
+
+def decode_cursor(cursor: str) -> tuple:
+    try:
+        updated_at, entry_id = json.loads(base64.urlsafe_b64decode(cursor))
+        return datetime.fromisoformat(updated_at), UUID(entry_id)
+    except (ValueError, TypeError) as e:
+        raise ValueError("Invalid cursor") from e
+
+
+async def stream_owned_cards(
+    user_id: UUID,
+    license_name: str | None = None,
+    extension_id: str | None = None,
+):
+    # Yield every owned entry from a server-side cursor, so memory
+    # stays flat whatever the collection size. Uses its own session:
+    # the stream outlives the request handler
+    stmt = owned_cards_query(user_id, license_name, extension_id)
+    async with postgres.AsyncSessionLocal() as db:
+        result = await db.stream(
+            stmt.execution_options(yield_per=VAULT_STREAM_BATCH)
+        )
+        async for row in result:
+            yield owned_entry(row)
 
 
 class CollectionService:
@@ -20,104 +145,305 @@ class CollectionService:
         extension_id: str | None = None,
         card_number: str | None = None,
         card_name: str | None = None,
-    ):
-        # Find existing card or create it
-        card_obj = (
-            self.db.query(Card)
-            .filter(Card.card_id == external_card_id)
-            .first()
-        )
-
-        if not card_obj:
-            card_obj = Card(
-                card_id=external_card_id,
-                variant=variant,
-                card_image=card_image,
-                extension_id=extension_id,
-                card_number=card_number,
-                card_name=card_name,
-            )
-            self.db.add(card_obj)
-            self.db.flush()
-        else:
-            # Update missing fields if now available
-            if card_image and not card_obj.card_image:
-                card_obj.card_image = card_image
-            if extension_id and not card_obj.extension_id:
-                card_obj.extension_id = extension_id
-            if card_number and not card_obj.card_number:
-                card_obj.card_number = card_number
-            if card_name and not card_obj.card_name:
-                card_obj.card_name = card_name
-
-        # Find existing collection entry for this user/card/variant
-        existing = (
-            self.db.query(Collection)
-            .filter_by(user_id=user_id, card_id=card_obj.id, variant=variant)
-            .first()
-        )
-
-        if existing:
-            existing.quantity += quantity
-
-            if existing.quantity > 0:
-                existing.updated_at = datetime.now()
-            elif existing.quantity == 0:
-                # Remove entry when quantity reaches zero
-                self.db.delete(existing)
-            else:
-                raise ValueError("Quantity cannot be negative")
-
-        else:
-            if quantity > 0:
-                existing = Collection(
-                    user_id=user_id,
-                    card_id=card_obj.id,
-                    variant=variant,
-                    quantity=quantity,
-                )
-                self.db.add(existing)
-            else:
-                raise ValueError(
-                    "Cannot remove a card that is not in collection"
-                )
-
-        self.db.commit()
-
+    ) -> dict:
+        # Card upsert and quantity change are single statements keyed
+        # on the unique constraints, so concurrent adds of the same
+        # card or entry cannot collide or lose an update
+        key = (external_card_id, variant)
+        card = {
+            "card_id": external_card_id,
+            "variant": variant,
+            "card_image": card_image,
+            "extension_id": extension_id,
+            "card_number": card_number,
+            "card_name": card_name,
+        }
         try:
-            if existing:
-                self.db.refresh(existing)
+            outcomes = self._apply_deltas(
+                user_id, {key: quantity}, {external_card_id: card}
+            )
+            new_quantity, error = outcomes[key]
+            if error:
+                raise ValueError(error)
+            self.db.commit()
         except Exception:
-            pass
+            self.db.rollback()
+            raise
 
-        return existing
+        return {
+            "card_id": external_card_id,
+            "variant": variant,
+            "quantity": new_quantity,
+        }
 
     def get_total_cards(self, user_id: UUID) -> int:
         # Return total number of cards owned by the user
         return (
-            self.db.query(func.sum(Collection.quantity))
-            .filter(Collection.user_id == user_id)
-            .scalar()
-        ) or 0
+            self.db.scalar(
+                select(CollectionCounter.value).where(
+                    CollectionCounter.user_id == user_id,
+                    CollectionCounter.scope == counters.TOTAL,
+                    CollectionCounter.key == "",
+                )
+            )
+            or 0
+        )
 
     def get_total_by_license(self, user_id: UUID) -> dict:
         # Return total card count grouped by license
-        entries = (
-            self.db.query(
-                Card.card_id, func.sum(Collection.quantity).label("total")
+        entries = self.db.execute(
+            select(CollectionCounter.key, CollectionCounter.value).where(
+                CollectionCounter.user_id == user_id,
+                CollectionCounter.scope == counters.LICENSE,
+                CollectionCounter.value != 0,
             )
-            .join(Collection, Collection.card_id == Card.id)
-            .filter(Collection.user_id == user_id)
-            .group_by(Card.card_id)
-            .all()
         )
+        return {license_name: total for license_name, total in entries}
+
+    def apply_batch(self, user_id: UUID, items: list) -> list:
+        # Apply many CollectionCreate items with set-based statements
+        # in one transaction. Quantities of the same card and variant
+        # are summed first; every item gets the result of its entry
+        deltas: dict = {}
+        cards: dict = {}
+        for item in items:
+            key = (item.card_id, item.variant)
+            deltas[key] = deltas.get(key, 0) + item.quantity
+            card = cards.setdefault(
+                item.card_id,
+                {"card_id": item.card_id, "variant": item.variant},
+            )
+            for field in CARD_DETAILS:
+                if getattr(item, field) and not card.get(field):
+                    card[field] = getattr(item, field)
 
-        counts: dict = {}
-        for card_id, total in entries:
-            license_name = card_id.split("-")[0]
-            counts[license_name] = counts.get(license_name, 0) + total
+        try:
+            outcomes = self._apply_deltas(user_id, deltas, cards)
+            self.db.commit()
+        except Exception:
+            self.db.rollback()
+            raise
 
-        return counts
+        results = []
+        for item in items:
+            quantity, error = outcomes[(item.card_id, item.variant)]
+            result = {"card_id": item.card_id, "variant": item.variant}
+            if error:
+                result.update(status="error", detail=error)
+            else:
+                result.update(status="ok", quantity=quantity)
+            results.append(result)
+        return results
+
+    def _apply_deltas(self, user_id: UUID, deltas: dict, cards: dict) -> dict:
+        # {(card_id, variant): delta} -> {(card_id, variant): (quantity,
+        # error)}. Rows are written in key order so concurrent batches
+        # lock them in the same order
+        now = datetime.now()
+        added = sorted(key for key, delta in deltas.items() if delta > 0)
+        removed = sorted(key for key, delta in deltas.items() if delta <= 0)
+
+        # Cards: create the ones being added, then look up the rest
+        card_rows = self._upsert_cards(
+            [cards[card_id] for card_id in sorted({c for c, _ in added})]
+        )
+        unknown = set(cards) - set(card_rows)
+        if unknown:
+            for row in self.db.execute(
+                select(Card.id, Card.card_id, Card.license).where(
+                    Card.card_id.in_(unknown)
+                )
+            ):
+                card_rows[row.card_id] = row
+
+        applied: dict = {}
+        if added:
+            stmt = insert(Collection).values(
+                [
+                    {
+                        "id": uuid4(),
+                        "user_id": user_id,
+                        "card_id": card_rows[card_id].id,
+                        "variant": variant,
+                        "quantity": deltas[(card_id, variant)],
+                        "updated_at": now,
+                    }
+                    for card_id, variant in added
+                ]
+            )
+            stmt = stmt.on_conflict_do_update(
+                constraint="uq_collections_user_card_variant",
+                set_={
+                    "quantity": Collection.quantity + stmt.excluded.quantity,
+                    "updated_at": stmt.excluded.updated_at,
+                },
+            ).returning(
+                Collection.card_id, Collection.variant, Collection.quantity
+            )
+            applied.update(
+                ((row.card_id, row.variant), row.quantity)
+                for row in self.db.execute(stmt)
+            )
+
+        # Removals only apply when enough copies are owned
+        known = [key for key in removed if key[0] in card_rows]
+        if known:
+            entries = [(card_rows[key[0]].id, key[1]) for key in known]
+            # Lock the entries first: a statement filters rows on its
+            # snapshot, so a concurrent add committed in between would
+            # make both writes below skip the row instead of rechecking
+            self.db.execute(
+                select(Collection.id)
+                .where(
+                    Collection.user_id == user_id,
+                    tuple_(Collection.card_id, Collection.variant).in_(
+                        entries
+                    ),
+                )
+                .order_by(Collection.card_id, Collection.variant)
+                .with_for_update()
+            ).all()
+
+            changes = values(
+                column("card_id", PG_UUID(as_uuid=True)),
+                column("variant", String),
+                column("delta", Integer),
+                name="changes",
+            ).data(
+                [
+                    (card_id, variant, deltas[key])
+                    for key, (card_id, variant) in zip(known, entries)
+                ]
+            )
+            matches = and_(
+                Collection.user_id == user_id,
+                Collection.card_id == changes.c.card_id,
+                Collection.variant == changes.c.variant,
+            )
+            left = Collection.quantity + changes.c.delta
+            # One statement: entries reaching zero are deleted, the
+            # others decremented. The two sets are disjoint, as a row
+            # cannot be modified twice in the same statement
+            emptied = (
+                delete(Collection)
+                .where(matches, left == 0)
+                .returning(
+                    Collection.card_id,
+                    Collection.variant,
+                    left.label("quantity"),
+                )
+                .cte("emptied")
+            )
+            decremented = (
+                update(Collection)
+                .where(matches, left > 0)
+                .values(quantity=left, updated_at=now)
+                .returning(
+                    Collection.card_id, Collection.variant, Collection.quantity
+                )
+                .cte("decremented")
+            )
+            applied.update(
+                ((row.card_id, row.variant), row.quantity)
+                for row in self.db.execute(
+                    union_all(select(emptied), select(decremented))
+                )
+            )
+
+        # Which removals failed: entry missing, or not enough copies
+        failed = [
+            key
+            for key in removed
+            if key[0] not in card_rows
+            or (card_rows[key[0]].id, key[1]) not in applied
+        ]
+        owned = set()
+        if any(key[0] in card_rows for key in failed):
+            owned = {
+                (row.card_id, row.variant)
+                for row in self.db.execute(
+                    select(Collection.card_id, Collection.variant).where(
+                        Collection.user_id == user_id,
+                        tuple_(Collection.card_id, Collection.variant).in_(
+                            [
+                                (card_rows[card_id].id, variant)
+                                for card_id, variant in failed
+                                if card_id in card_rows
+                            ]
+                        ),
+                    )
+                )
+            }
+
+        outcomes = {}
+        changes = []
+        for card_id, variant in added + removed:
+            card = card_rows.get(card_id)
+            entry = (card.id, variant) if card else None
+            if entry in applied:
+                outcomes[(card_id, variant)] = (applied[entry], None)
+                changes.append(
+                    (card.license, variant, deltas[(card_id, variant)])
+                )
+            elif entry in owned:
+                outcomes[(card_id, variant)] = (
+                    None,
+                    "Quantity cannot be negative",
+                )
+            else:
+                outcomes[(card_id, variant)] = (
+                    None,
+                    "Cannot remove a card that is not in collection",
+                )
+
+        # Keep the running totals in the same transaction
+        counters.bump(self.db, user_id, changes)
+        return outcomes
+
+    def _upsert_cards(self, cards: list) -> dict:
+        # Insert missing cards, fill empty details of existing ones.
+        # Returns {card_id: row} for the rows inserted or updated
+        if not cards:
+            return {}
+
+        now = datetime.now()
+        rows = [
+            {
+                "id": uuid4(),
+                "card_id": card["card_id"],
+                "variant": card["variant"],
+                "license": card_license(card["card_id"]),
+                "card_image": card.get("card_image"),
+                "extension_id": card.get("extension_id")
+                or card_extension(card["card_id"]),
+                "card_number": card.get("card_number"),
+                "card_name": card.get("card_name"),
+                "added_at": now,
+            }
+            for card in cards
+        ]
+        stmt = insert(Card).values(rows)
+
+        # Only rows with something to fill are rewritten (and locked)
+        fillable = {
+            field: and_(
+                func.coalesce(getattr(Card, field), "") == "",
+                func.coalesce(getattr(stmt.excluded, field), "") != "",
+            )
+            for field in CARD_DETAILS
+        }
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[Card.card_id],
+            set_={
+                field: case(
+                    (condition, getattr(stmt.excluded, field)),
+                    else_=getattr(Card, field),
+                )
+                for field, condition in fillable.items()
+            },
+            where=or_(*fillable.values()),
+        ).returning(Card.id, Card.card_id, Card.license)
+        return {row.card_id: row for row in self.db.execute(stmt)}
 
     def get_card_quantities(
         self, user_id: UUID, external_card_id: str
@@ -148,15 +474,13 @@ class CollectionService:
 
     def get_owned_by_extension(self, user_id: UUID, extension_id: str) -> dict:
         # Return list of owned card_ids for a given extension
-        prefix = f"%-{extension_id}-%"
-
         owned_cards = (
             self.db.query(Card.card_id)
             .join(Collection, Collection.card_id == Card.id)
             .filter(
                 Collection.user_id == user_id,
                 Collection.quantity > 0,
-                Card.card_id.like(prefix),
+                Card.extension_id == extension_id,
             )
             .distinct()
             .all()
@@ -170,103 +494,135 @@ class CollectionService:
         }
 
     def get_stats(self, user_id: UUID) -> dict:
-        # Return comprehensive collection statistics for the user
-
-        # Total cards owned
-        total_cards = self.get_total_cards(user_id)
-
-        # Cards grouped by license
-        by_license = self.get_total_by_license(user_id)
-
-        # Cards grouped by variant
-        variant_entries = (
-            self.db.query(
-                Collection.variant,
-                func.sum(Collection.quantity).label("total"),
+        # Return comprehensive collection statistics for the user.
+        # One statement: totals from the counters, distinct counts
+        # via FILTER and the latest entry
+        owned = (
+            select(
+                Card.card_id,
+                Card.license,
+                Card.card_name,
+                Card.card_number,
+                Card.extension_id,
+                Card.card_image,
+                Collection.quantity,
+                Collection.updated_at,
             )
-            .filter(Collection.user_id == user_id)
-            .group_by(Collection.variant)
-            .all()
+            .join(Collection, Collection.card_id == Card.id)
+            .where(Collection.user_id == user_id)
+            .cte("owned")
         )
-        by_variant = {v: int(t) for v, t in variant_entries}
 
-        # Number of unique extensions owned
-        unique_extensions = (
-            self.db.query(Card.extension_id)
-            .join(Collection, Collection.card_id == Card.id)
-            .filter(
-                Collection.user_id == user_id,
-                Collection.quantity > 0,
-                Card.extension_id.isnot(None),
+        totals = (
+            select(CollectionCounter)
+            .where(
+                CollectionCounter.user_id == user_id,
+                CollectionCounter.value != 0,
             )
-            .distinct()
-            .count()
+            .cte("totals")
         )
 
-        # Number of unique cards owned
-        unique_cards = (
-            self.db.query(Card.card_id)
-            .join(Collection, Collection.card_id == Card.id)
-            .filter(Collection.user_id == user_id, Collection.quantity > 0)
-            .distinct()
-            .count()
+        counts = select(
+            func.count(distinct(owned.c.card_id))
+            .filter(owned.c.quantity > 0)
+            .label("unique_cards"),
+            func.count(distinct(owned.c.extension_id))
+            .filter(owned.c.quantity > 0)
+            .label("unique_extensions"),
+        ).cte("counts")
+
+        recent = (
+            select(owned)
+            .order_by(owned.c.updated_at.desc())
+            .limit(1)
+            .cte("recent")
         )
 
-        # Most recently added card
-        recent = self.get_recent_cards(user_id, limit=1)
-        last_card = recent[0] if recent else None
+        def scope_object(scope: str):
+            return (
+                select(
+                    func.json_object_agg(
+                        totals.c.key, totals.c.value, type_=JSON
+                    )
+                )
+                .where(totals.c.scope == scope)
+                .scalar_subquery()
+            )
+
+        stmt = select(
+            select(totals.c.value)
+            .where(totals.c.scope == counters.TOTAL)
+            .scalar_subquery()
+            .label("total_cards"),
+            scope_object(counters.LICENSE).label("by_license"),
+            scope_object(counters.VARIANT).label("by_variant"),
+            counts.c.unique_cards,
+            counts.c.unique_extensions,
+            recent,
+        ).select_from(counts.outerjoin(recent, true()))
+
+        row = self.db.execute(stmt).one()
+
+        last_card = None
+        if row.card_id is not None:
+            last_card = {
+                **_card_summary(row),
+                "updated_at": row.updated_at.isoformat(),
+            }
 
         return {
-            "total_cards": total_cards,
-            "unique_cards": unique_cards,
-            "unique_extensions": unique_extensions,
-            "by_license": by_license,
-            "by_variant": by_variant,
+            "total_cards": row.total_cards or 0,
+            "unique_cards": row.unique_cards,
+            "unique_extensions": row.unique_extensions,
+            "by_license": row.by_license or {},
+            "by_variant": row.by_variant or {},
             "last_card": last_card,
         }
 
     def get_all_owned_cards(self, user_id: UUID) -> list:
         # Return all cards owned by the user with their quantities
-        entries = (
-            self.db.query(Collection, Card)
-            .join(Card, Card.id == Collection.card_id)
-            .filter(Collection.user_id == user_id, Collection.quantity > 0)
-            .order_by(Collection.updated_at.desc())
-            .all()
-        )
+        entries = self.db.execute(owned_cards_query(user_id))
 
         seen = set()
         results = []
 
-        for collection, card in entries:
-            if card.card_id in seen:
+        for row in entries:
+            if row.card_id in seen:
                 continue
-            seen.add(card.card_id)
+            seen.add(row.card_id)
 
-            license_name = card.card_id.split("-")[0]
+            results.append({**_card_summary(row), "quantity": row.quantity})
 
-            # Fallback for Pokémon cards
-            if license_name == "pokemon" and not card.extension_id:
-                parts = card.card_id.split("-")
-                fallback_card_number = parts[-1]
-                fallback_extension_id = "-".join(parts[1:-1])
-            else:
-                fallback_card_number = ""
-                fallback_extension_id = ""
+        return results
 
-            results.append(
-                {
-                    "card_id": card.card_id,
-                    "card_name": card.card_name or "",
-                    "card_number": card.card_number or fallback_card_number,
-                    "extension_id": card.extension_id or fallback_extension_id,
-                    "license": license_name,
-                    "card_image": card.card_image or "",
-                    "quantity": collection.quantity,
-                }
+    def get_owned_cards_page(
+        self,
+        user_id: UUID,
+        limit: int,
+        cursor: str | None = None,
+        license_name: str | None = None,
+        extension_id: str | None = None,
+    ) -> dict:
+        # Keyset page of owned entries, resumed after the cursor
+        stmt = owned_cards_query(user_id, license_name, extension_id)
+        if cursor:
+            updated_at, entry_id = decode_cursor(cursor)
+            stmt = stmt.where(
+                tuple_(Collection.updated_at, Collection.id)
+                < tuple_(updated_at, entry_id)
             )
 
-        return results
+        # One extra row tells whether another page follows
+        rows = self.db.execute(stmt.limit(limit + 1)).all()
+        next_cursor = None
+        if len(rows) > limit:
+            rows = rows[:limit]
+            next_cursor = encode_cursor(rows[-1])
+
+        return {
+            "items": [owned_entry(row) for row in rows],
+            "next_cursor": next_cursor,
+        }
 
     def get_recent_cards(self, user_id: UUID, limit: int = 10) -> list:
         # Return the most recent cards in the user's collection
@@ -287,28 +643,66 @@ class CollectionService:
                 continue
             seen.add(card.card_id)
 
-            card_id = card.card_id
-            license_name = card_id.split("-")[0]
-
-            # Fallback for Pokémon cards
-            if license_name == "pokemon" and not card.extension_id:
-                parts = card_id.split("-")
-                fallback_card_number = parts[-1]
-                fallback_extension_id = "-".join(parts[1:-1])
-            else:
-                fallback_card_number = ""
-                fallback_extension_id = ""
-
             results.append(
                 {
-                    "card_id": card_id,
-                    "card_name": card.card_name or "",
-                    "card_number": card.card_number or fallback_card_number,
-                    "extension_id": card.extension_id or fallback_extension_id,
-                    "license": license_name,
-                    "card_image": card.card_image or "",
+                    **_card_summary(card),
                     "updated_at": collection.updated_at.isoformat(),
                 }
             )
 
         return results
+
+
+# Async facade over CollectionService for the asyncpg session.
+# run_sync drives the same ORM code in a greenlet: every round trip
+# awaits asyncpg, so the event loop keeps serving other requests
+class AsyncCollectionService:
+    def __init__(self, db: AsyncSession):
+        self.db = db
+
+    async def _run(self, method: str, *args, **kwargs):
+        def call(session: Session):
+            service = CollectionService(session)
+            return getattr(service, method)(*args, **kwargs)
+
+        return await self.db.run_sync(call)
+
+    async def add_card_to_collection(self, user_id: UUID, **kwargs):
+        return await self._run("add_card_to_collection", user_id, **kwargs)
+
+    async def apply_batch(self, user_id: UUID, items: list) -> list:
+        return await self._run("apply_batch", user_id, items)
+
+    async def get_total_cards(self, user_id: UUID) -> int:
+        return await self._run("get_total_cards", user_id)
+
+    async def get_total_by_license(self, user_id: UUID) -> dict:
+        return await self._run("get_total_by_license", user_id)
+
+    async def get_card_quantities(
+        self, user_id: UUID, external_card_id: str
+    ) -> dict:
+        return await self._run(
+            "get_card_quantities", user_id, external_card_id
+        )
+
+    async def get_owned_by_extension(
+        self, user_id: UUID, extension_id: str
+    ) -> dict:
+        return await self._run("get_owned_by_extension", user_id, extension_id)
+
+    async def get_stats(self, user_id: UUID) -> dict:
+        return await self._run("get_stats", user_id)
+
+    async def get_all_owned_cards(self, user_id: UUID) -> list:
+        return await self._run("get_all_owned_cards", user_id)
+
+    async def get_owned_cards_page(
+        self, user_id: UUID, limit: int, **kwargs
+    ) -> dict:
+        return await self._run(
+            "get_owned_cards_page", user_id, limit, **kwargs
+        )
+
+    async def get_recent_cards(self, user_id: UUID, limit: int = 10) -> list:
+        return await self._run("get_recent_cards", user_id, limit=limit)
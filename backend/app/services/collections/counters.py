@@ -0,0 +1,146 @@
+"""Rebuild the per-user collection counters from collections.
+
+Run from the backend directory:
+
+    python -m app.services.collections.counters [--user UUID]
+
+CollectionService keeps the counters in step with every quantity
+change, so this is only needed once after the table is created (the
+API does it at startup when the table is empty) or to repair drift.
+"""
+
+import argparse
+from collections import defaultdict
+from typing import Iterable
+from uuid import UUID
+from sqlalchemy import delete, exists, func, literal, select, text, union_all
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.orm import Session
+from app.models.card import Card
+from app.models.collection_counter import CollectionCounter
+from app.models.collections import Collection
+from app.models.user import User  # noqa: F401 (Collection.user mapper)
+from app.services.database.postgres import postgres
+
+TOTAL = "total"
+LICENSE = "license"
+VARIANT = "variant"
+
+
+def bump(db: Session, user_id: UUID, changes: Iterable[tuple]) -> None:
+    # Apply (license, variant, delta) quantity changes to the user's
+    # counters, in the caller's transaction
+    deltas: dict = defaultdict(int)
+    for license_name, variant, delta in changes:
+        deltas[(TOTAL, "")] += delta
+        deltas[(LICENSE, license_name)] += delta
+        deltas[(VARIANT, variant)] += delta
+
+    # Same row order in every transaction, the total row first, so
+    # concurrent writers of one user queue instead of deadlocking
+    rows = [
+        {"user_id": user_id, "scope": scope, "key": key, "value": delta}
+        for (scope, key), delta in sorted(
+            deltas.items(), key=lambda item: (item[0][0] != TOTAL, item[0])
+        )
+        if delta
+    ]
+    if not rows:
+        return
+
+    stmt = insert(CollectionCounter).values(rows)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[
+            CollectionCounter.user_id,
+            CollectionCounter.scope,
+            CollectionCounter.key,
+        ],
+        set_={"value": CollectionCounter.value + stmt.excluded.value},
+    )
+    db.execute(stmt)
+
+
+def _lock_collections(db: Session) -> None:
+    # Readers get through, writers wait until the rebuilt counters are
+    # committed. Unlike SHARE, this mode conflicts with itself, so two
+    # rebuilds (e.g. workers starting together) run one after the other
+    db.execute(text("LOCK TABLE collections IN SHARE ROW EXCLUSIVE MODE"))
+
+
+def reconcile(db: Session, user_id: UUID | None = None) -> int:
+    # Recompute the counters of one user (or everyone) from collections
+    # and return the number of counter rows written
+    _lock_collections(db)
+
+    clear = delete(CollectionCounter)
+    owned = (
+        select(
+            Collection.user_id,
+            Card.license,
+            Collection.variant,
+            Collection.quantity,
+        )
+        .join(Card, Card.id == Collection.card_id)
+    )
+    if user_id is not None:
+        clear = clear.where(CollectionCounter.user_id == user_id)
+        owned = owned.where(Collection.user_id == user_id)
+    owned = owned.subquery()
+
+    total = func.sum(owned.c.quantity)
+    counts = union_all(
+        select(owned.c.user_id, literal(TOTAL), literal(""), total)
+        .group_by(owned.c.user_id),
+        select(owned.c.user_id, literal(LICENSE), owned.c.license, total)
+        .group_by(owned.c.user_id, owned.c.license),
+        select(owned.c.user_id, literal(VARIANT), owned.c.variant, total)
+        .group_by(owned.c.user_id, owned.c.variant),
+    )
+
+    db.execute(clear)
+    result = db.execute(
+        insert(CollectionCounter).from_select(
+            ["user_id", "scope", "key", "value"], counts
+        )
+    )
+    db.commit()
+    return result.rowcount
+
+
+def reconcile_if_empty(db: Session) -> None:
+    # First start after the table was added: backfill from collections
+    has_counters = select(exists().select_from(CollectionCounter))
+    if db.scalar(has_counters):
+        return
+    if not db.scalar(select(exists().select_from(Collection))):
+        return
+
+    # Check again under the lock: another worker may have just done it
+    _lock_collections(db)
+    if db.scalar(has_counters):
+        db.commit()
+        return
+    print("Collection counters are empty, rebuilding them")
+    print(f"Wrote {reconcile(db)} collection counters")
+
+
+# ---------- Entry point ---------- #
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description="Rebuild the collection counters"
+    )
+    parser.add_argument("--user", type=UUID, help="Only this user id")
+    args = parser.parse_args()
+
+    db = postgres.SessionLocal()
+
+    try:
+        print(f"Wrote {reconcile(db, args.user)} collection counters")
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,50 @@
+import csv
+import io
+import json
+import zlib
+from typing import AsyncIterator
+
+# Column order of CSV exports
+EXPORT_FIELDS = (
+    "card_id",
+    "card_name",
+    "license",
+    "extension_id",
+    "card_number",
+    "variant",
+    "quantity",
+    "card_image",
+    "updated_at",
+)
+
+
+async def ndjson_lines(entries: AsyncIterator[dict]) -> AsyncIterator[str]:
+    async for entry in entries:
+        yield json.dumps(entry) + "\n"
+
+
+async def csv_lines(entries: AsyncIterator[dict]) -> AsyncIterator[str]:
+    # One reused buffer: only the current row is ever held in memory
+    buffer = io.StringIO()
+    writer = csv.DictWriter(
+        buffer, fieldnames=EXPORT_FIELDS, extrasaction="ignore"
+    )
+    writer.writeheader()
+    async for entry in entries:
+        writer.writerow(entry)
+        yield buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate()
+    if buffer.tell():
+        yield buffer.getvalue()
+
+
+async def gzip_chunks(lines: AsyncIterator[str]) -> AsyncIterator[bytes]:
+    # Compress on the fly; zlib buffers internally and only hands
+    # back a chunk once it has filled a deflate block
+    compressor = zlib.compressobj(wbits=31)  # gzip header and trailer
+    async for line in lines:
+        chunk = compressor.compress(line.encode())
+        if chunk:
+            yield chunk
+    yield compressor.flush()
@@ -9,6 +9,8 @@ import app.services.database.redis.redis as redis_client
 class SessionManager:
     def __init__(self):
         self.redis_cache = redis_client.RedisCache()
+        # Used by the request path, which must not block the event loop
+        self.async_redis_cache = redis_client.AsyncRedisCache()
         self.session_timeout = int(os.environ.get("REDIS_EXPIRATION", 3600))
 
     # Create a new session for a user
@@ -45,6 +47,15 @@ class SessionManager:
 
         return json.loads(session_data)
 
+    # Same as read_session, from async code
+    async def read_session_async(self, session_id: str):
+        session_data = await self.async_redis_cache.read_redis(session_id)
+
+        if not session_data:
+            return None
+
+        return json.loads(session_data)
+
     # Update session data
     def update_session(self, session_id):
         # Check if session exists
@@ -62,3 +73,6 @@ class SessionManager:
     def delete_session(self, session_id):
         self.redis_cache.delete_redis(session_id)
         return True
+
+    async def close(self) -> None:
+        await self.async_redis_cache.close()
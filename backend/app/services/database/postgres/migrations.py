@@ -0,0 +1,33 @@
+from pathlib import Path
+from alembic import command
+from alembic.config import Config
+from sqlalchemy import text
+from app.services.database.postgres import postgres
+
+BACKEND_DIR = Path(__file__).resolve().parents[4]
+ALEMBIC_INI = BACKEND_DIR / "alembic.ini"
+# Any constant works, it only has to be the same in every worker
+MIGRATION_LOCK_ID = 20260418
+
+
+def alembic_config() -> Config:
+    config = Config(str(ALEMBIC_INI))
+    config.set_main_option("script_location", str(BACKEND_DIR / "migrations"))
+    return config
+
+
+def upgrade(revision: str = "head") -> None:
+    # Workers start together: the first one migrates, the others wait
+    # on the advisory lock and then find nothing left to do
+    with postgres.engine.connect() as connection:
+        lock = {"id": MIGRATION_LOCK_ID}
+        connection.execute(text("SELECT pg_advisory_lock(:id)"), lock)
+        connection.commit()
+        try:
+            config = alembic_config()
+            config.attributes["connection"] = connection
+            command.upgrade(config, revision)
+            connection.commit()
+        finally:
+            connection.execute(text("SELECT pg_advisory_unlock(:id)"), lock)
+            connection.commit()
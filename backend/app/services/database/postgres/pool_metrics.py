@@ -0,0 +1,117 @@
+import time
+from collections import deque
+from sqlalchemy import event
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+
+# Samples kept for the wait/hold percentiles
+SAMPLE_SIZE = 1000
+
+
+def _summary(samples) -> dict:
+    # Milliseconds, over the most recent samples
+    if not samples:
+        return {"p50_ms": None, "p95_ms": None, "max_ms": None}
+    ordered = sorted(samples)
+    return {
+        "p50_ms": round(1000 * ordered[len(ordered) // 2], 2),
+        "p95_ms": round(1000 * ordered[int(len(ordered) * 0.95)], 2),
+        "max_ms": round(1000 * ordered[-1], 2),
+    }
+
+
+# Counters and timings for one engine's connection pool
+class PoolMetrics:
+    def __init__(self):
+        self.engine = None
+        self.checkouts = 0
+        self.connects = 0
+        self.invalidations = 0
+        self.timeouts = 0
+        self.wait_total = 0.0
+        self.hold_total = 0.0
+        self._waits = deque(maxlen=SAMPLE_SIZE)
+        self._holds = deque(maxlen=SAMPLE_SIZE)
+
+    def attach(self, engine) -> None:
+        # Pool events registered on the engine survive pool recreation
+        self.engine = engine
+        event.listen(engine, "connect", self._on_connect)
+        event.listen(engine, "checkout", self._on_checkout)
+        event.listen(engine, "checkin", self._on_checkin)
+        event.listen(engine, "invalidate", self._on_invalidate)
+
+    def record_wait(self, seconds: float, timed_out: bool = False) -> None:
+        self.wait_total += seconds
+        self._waits.append(seconds)
+        if timed_out:
+            self.timeouts += 1
+
+    def _on_connect(self, dbapi_connection, connection_record):
+        self.connects += 1
+
+    def _on_checkout(self, dbapi_connection, connection_record, proxy):
+        self.checkouts += 1
+        connection_record.info["checked_out_at"] = time.perf_counter()
+
+    def _on_checkin(self, dbapi_connection, connection_record):
+        # How long the request held the connection
+        start = connection_record.info.pop("checked_out_at", None)
+        if start is not None:
+            held = time.perf_counter() - start
+            self.hold_total += held
+            self._holds.append(held)
+
+    def _on_invalidate(self, dbapi_connection, connection_record, exception):
+        self.invalidations += 1
+
+    def stats(self) -> dict:
+        pool = self.engine.pool if self.engine is not None else None
+        live = {}
+        if pool is not None and hasattr(pool, "checkedout"):
+            live = {
+                "size": pool.size(),
+                "checked_out": pool.checkedout(),
+                "checked_in": pool.checkedin(),
+                "overflow": pool.overflow(),
+            }
+        return {
+            **live,
+            "checkouts": self.checkouts,
+            "connects": self.connects,
+            "invalidations": self.invalidations,
+            "timeouts": self.timeouts,
+            "wait_total_s": round(self.wait_total, 3),
+            "wait": _summary(self._waits),
+            "hold_total_s": round(self.hold_total, 3),
+            "hold": _summary(self._holds),
+        }
+
+
+# Times how long callers wait for a connection from the pool.
+# SQLAlchemy has no event before a checkout, so the pool's getter
+# is wrapped; recreate() keeps the subclass and so the metrics
+class _TimedPool:
+    metrics: PoolMetrics
+
+    def _do_get(self):
+        start = time.perf_counter()
+        try:
+            connection = super()._do_get()
+        except PoolTimeoutError:
+            self.metrics.record_wait(time.perf_counter() - start, True)
+            raise
+        self.metrics.record_wait(time.perf_counter() - start)
+        return connection
+
+
+def timed_pool(pool_class, metrics: PoolMetrics):
+    return type(
+        f"Timed{pool_class.__name__}",
+        (_TimedPool, pool_class),
+        {"metrics": metrics},
+    )
+
+
+# One per engine, see postgres.py
+sync_pool_metrics = PoolMetrics()
+async_pool_metrics = PoolMetrics()
@@ -1,7 +1,14 @@
 import os
 from sqlalchemy import create_engine
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
 from sqlalchemy.orm import sessionmaker, declarative_base
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
 from app.services.database.postgres import postgres
+from app.services.database.postgres.pool_metrics import (
+    async_pool_metrics,
+    sync_pool_metrics,
+    timed_pool,
+)
 
 # Choose localhost or postgres
 db_host = (
@@ -12,14 +19,50 @@ db_password = os.environ.get("DB_PASSWORD")
 db_name = os.environ.get("DB_NAME")
 db_port = os.environ.get("DB_PORT", "5432")
 
-# Create the database URL
+# Create the database URLs
 db_url = f"postgresql://{db_user}:{db_password}@{db_host}:{db_port}/{db_name}"
+async_db_url = db_url.replace("postgresql://", "postgresql+asyncpg://", 1)
+
+# Pool configuration, applied to each engine in every worker process
+DB_POOL_SIZE = int(os.environ.get("DB_POOL_SIZE", "5"))
+DB_MAX_OVERFLOW = int(os.environ.get("DB_MAX_OVERFLOW", "10"))
+DB_POOL_TIMEOUT = float(os.environ.get("DB_POOL_TIMEOUT", "30"))
+# Seconds before a connection is replaced, -1 keeps them forever
+DB_POOL_RECYCLE = int(os.environ.get("DB_POOL_RECYCLE", "1800"))
+DB_POOL_PRE_PING = (
+    os.environ.get("DB_POOL_PRE_PING", "true").lower() == "true"
+)
+
+pool_options = {
+    "pool_size": DB_POOL_SIZE,
+    "max_overflow": DB_MAX_OVERFLOW,
+    "pool_timeout": DB_POOL_TIMEOUT,
+    "pool_recycle": DB_POOL_RECYCLE,
+    "pool_pre_ping": DB_POOL_PRE_PING,
+}
 
 # Create the SQLAlchemy engine and session
-engine = create_engine(db_url)
+engine = create_engine(
+    db_url,
+    poolclass=timed_pool(QueuePool, sync_pool_metrics),
+    **pool_options,
+)
+sync_pool_metrics.attach(engine)
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 Base = declarative_base()
 
+# Async engine (asyncpg) for request handlers, so queries await
+# instead of blocking the event loop
+async_engine = create_async_engine(
+    async_db_url,
+    poolclass=timed_pool(AsyncAdaptedQueuePool, async_pool_metrics),
+    **pool_options,
+)
+async_pool_metrics.attach(async_engine.sync_engine)
+AsyncSessionLocal = async_sessionmaker(
+    bind=async_engine, autoflush=False, expire_on_commit=False
+)
+
 
 # Dependency to get DB session
 def get_postgres():
@@ -28,3 +71,17 @@ def get_postgres():
         yield db
     finally:
         db.close()
+
+
+# Dependency to get an async DB session
+async def get_postgres_async():
+    async with postgres.AsyncSessionLocal() as db:
+        yield db
+
+
+def pool_status() -> dict:
+    return {
+        "config": pool_options,
+        "sync": sync_pool_metrics.stats(),
+        "async": async_pool_metrics.stats(),
+    }
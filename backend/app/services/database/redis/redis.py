@@ -1,7 +1,14 @@
 import os
 import redis
+import redis.asyncio as redis_async
 from typing import Any
 
+# Seconds before a Redis call gives up; callers treat it as a miss
+REDIS_SOCKET_TIMEOUT = float(os.environ.get("REDIS_SOCKET_TIMEOUT", "0.5"))
+REDIS_CONNECT_TIMEOUT = float(
+    os.environ.get("REDIS_CONNECT_TIMEOUT", "0.5")
+)
+
 
 class RedisCache:
     def __init__(self):
@@ -61,3 +68,40 @@ class RedisCache:
             self.redis_client.flushdb()
         except Exception as e:
             raise RuntimeError(f"Failed to clear Redis database. {e}")
+
+
+class AsyncRedisCache:
+    # Same calls as RedisCache for code running on the event loop:
+    # a slow or unreachable Redis fails fast instead of blocking it
+    def __init__(self):
+        redis_port = os.environ.get("REDIS_PORT", "6379")
+        redis_url = f"redis://redis:{redis_port}/0"
+
+        self.redis_client = redis_async.from_url(
+            redis_url,
+            decode_responses=True,
+            socket_timeout=REDIS_SOCKET_TIMEOUT,
+            socket_connect_timeout=REDIS_CONNECT_TIMEOUT,
+        )
+
+    # Store data in Redis
+    async def create_redis(
+        self,
+        key: str,
+        value: Any,
+        expiration_time: int = int(os.environ.get("REDIS_EXPIRATION", 3600)),
+    ) -> None:
+        try:
+            await self.redis_client.set(key, value, expiration_time)
+        except Exception as e:
+            raise RuntimeError(f"Failed to store key '{key}' in Redis. {e}")
+
+    # Retrieve data from Redis
+    async def read_redis(self, key: str):
+        try:
+            return await self.redis_client.get(key)
+        except Exception as e:
+            raise RuntimeError(f"Failed to retrieve key '{key}' in Redis. {e}")
+
+    async def close(self) -> None:
+        await self.redis_client.aclose()
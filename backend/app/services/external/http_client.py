@@ -0,0 +1,70 @@
+import os
+import httpx
+
+# Pool configuration shared by every upstream client
+HTTP_TIMEOUT = float(os.environ.get("HTTP_TIMEOUT", "10"))
+HTTP_CONNECT_TIMEOUT = float(os.environ.get("HTTP_CONNECT_TIMEOUT", "5"))
+HTTP_MAX_CONNECTIONS = int(os.environ.get("HTTP_MAX_CONNECTIONS", "20"))
+HTTP_MAX_KEEPALIVE = int(os.environ.get("HTTP_MAX_KEEPALIVE", "10"))
+HTTP_KEEPALIVE_EXPIRY = float(os.environ.get("HTTP_KEEPALIVE_EXPIRY", "30"))
+HTTP2_ENABLED = os.environ.get("HTTP2_ENABLED", "true").lower() == "true"
+
+HEADERS = {
+    "User-Agent": "CardVault/1.0",
+    "Accept": "application/json",
+}
+
+# One entry per upstream (e.g. "scryfall", "tcgdex")
+UPSTREAMS = {
+    "scryfall": {"base_url": "https://api.scryfall.com/", "http2": True},
+    "tcgdex": {"base_url": "https://api.tcgdex.net/v2/", "http2": True},
+}
+
+_clients: dict[str, httpx.AsyncClient] = {}
+
+
+def _http2_available() -> bool:
+    # HTTP/2 needs the optional "h2" package
+    try:
+        import h2  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+def create_client(base_url: str, http2: bool = True) -> httpx.AsyncClient:
+    # Build a keep-alive client with per-host limits and timeouts
+    return httpx.AsyncClient(
+        base_url=base_url,
+        headers=HEADERS,
+        http2=http2 and HTTP2_ENABLED and _http2_available(),
+        limits=httpx.Limits(
+            max_connections=HTTP_MAX_CONNECTIONS,
+            max_keepalive_connections=HTTP_MAX_KEEPALIVE,
+            keepalive_expiry=HTTP_KEEPALIVE_EXPIRY,
+        ),
+        timeout=httpx.Timeout(HTTP_TIMEOUT, connect=HTTP_CONNECT_TIMEOUT),
+    )
+
+
+async def open_clients() -> None:
+    # Create one pooled client per upstream (called from app lifespan)
+    for name, config in UPSTREAMS.items():
+        if name not in _clients or _clients[name].is_closed:
+            _clients[name] = create_client(**config)
+
+
+async def close_clients() -> None:
+    # Close every pooled client (called from app lifespan)
+    for client in _clients.values():
+        await client.aclose()
+    _clients.clear()
+
+
+def get_client(name: str) -> httpx.AsyncClient:
+    # Return the shared client, creating it lazily outside the lifespan
+    client = _clients.get(name)
+    if client is None or client.is_closed:
+        client = create_client(**UPSTREAMS[name])
+        _clients[name] = client
+    return client
@@ -1,31 +1,144 @@
+import asyncio
+import math
+import os
+import time
+from typing import AsyncIterator
 import httpx
+from app.services.external.http_client import get_client
 
-BASE_URL = "https://api.scryfall.com/"
+UPSTREAM = "scryfall"
+# Scryfall search pages hold up to 175 cards
+PAGE_SIZE = 175
+# Scryfall asks for at most ~10 requests per second
+SCRYFALL_RATE_LIMIT = float(os.environ.get("SCRYFALL_RATE_LIMIT", "10"))
+SCRYFALL_PAGE_CONCURRENCY = int(
+    os.environ.get("SCRYFALL_PAGE_CONCURRENCY", "4")
+)
 
 
-async def fetch_extensions():
-    async with httpx.AsyncClient() as client:
-        response = await client.get(f"{BASE_URL}/sets")
-    return response
+class RateLimiter:
+    def __init__(self, rate: float):
+        self.interval = 1 / rate if rate > 0 else 0
+        self._lock = asyncio.Lock()
+        self._next_slot = 0.0
 
+    # Space request starts by at least 1/rate seconds
+    async def wait(self) -> None:
+        async with self._lock:
+            delay = self._next_slot - time.monotonic()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            self._next_slot = time.monotonic() + self.interval
 
-async def fetch_extension(extension_name: str):
-    async with httpx.AsyncClient() as client:
-        response = await client.get(f"{BASE_URL}/sets/{extension_name}")
-    return response
 
+rate_limiter = RateLimiter(SCRYFALL_RATE_LIMIT)
 
-async def fetch_cards(extension_name: str):
-    async with httpx.AsyncClient() as client:
-        response = await client.get(
-            f"{BASE_URL}/cards/search", params={"q": f"set:{extension_name}"}
-        )
-    return response
 
+async def _get(
+    url: str,
+    params: dict | None = None,
+    client: httpx.AsyncClient | None = None,
+):
+    client = client or get_client(UPSTREAM)
+    await rate_limiter.wait()
+    return await client.get(url, params=params)
 
-async def fetch_card(extension_name: str, collector_number: str):
-    async with httpx.AsyncClient() as client:
-        response = await client.get(
-            f"{BASE_URL}/cards/{extension_name}/{collector_number}"
-        )
-    return response
+
+async def fetch_extensions(client: httpx.AsyncClient | None = None):
+    return await _get("sets", client=client)
+
+
+async def fetch_extension(
+    extension_name: str, client: httpx.AsyncClient | None = None
+):
+    return await _get(f"sets/{extension_name}", client=client)
+
+
+async def fetch_cards(
+    extension_name: str,
+    page: int = 1,
+    client: httpx.AsyncClient | None = None,
+):
+    return await _get(
+        "cards/search",
+        params={"q": f"set:{extension_name}", "page": page},
+        client=client,
+    )
+
+
+async def fetch_card(
+    extension_name: str,
+    collector_number: str,
+    client: httpx.AsyncClient | None = None,
+):
+    return await _get(
+        f"cards/{extension_name}/{collector_number}", client=client
+    )
+
+
+async def iter_card_pages(
+    extension_name: str, client: httpx.AsyncClient | None = None
+) -> AsyncIterator[dict]:
+    # Yield every search page in order, the first one as soon as ready
+    response = await fetch_cards(extension_name, client=client)
+    if response.status_code != 200:
+        return
+
+    first_page = response.json()
+    yield first_page
+
+    if not first_page.get("has_more"):
+        return
+
+    # Without a total, the only way forward is next_page
+    if "total_cards" not in first_page:
+        page = first_page
+        while page.get("has_more") and page.get("next_page"):
+            response = await _get(page["next_page"], client=client)
+            response.raise_for_status()
+            page = response.json()
+            yield page
+        return
+
+    # Fetch the remaining pages concurrently, bounded by the semaphore
+    # and the shared rate limiter
+    total_pages = math.ceil(first_page["total_cards"] / PAGE_SIZE)
+    semaphore = asyncio.Semaphore(SCRYFALL_PAGE_CONCURRENCY)
+
+    async def fetch_page(page: int):
+        async with semaphore:
+            return await fetch_cards(extension_name, page=page, client=client)
+
+    tasks = [
+        asyncio.create_task(fetch_page(page))
+        for page in range(2, total_pages + 1)
+    ]
+    try:
+        for task in tasks:
+            response = await task
+            response.raise_for_status()
+            yield response.json()
+    finally:
+        for task in tasks:
+            task.cancel()
+
+
+async def fetch_all_cards(
+    extension_name: str, client: httpx.AsyncClient | None = None
+) -> dict | None:
+    # Merge every search page into one Scryfall-shaped list
+    cards = []
+    total_cards = None
+    async for page in iter_card_pages(extension_name, client=client):
+        total_cards = page.get("total_cards", total_cards)
+        cards.extend(page.get("data", []))
+
+    if total_cards is None and not cards:
+        return None
+
+    return {
+        "object": "list",
+        "total_cards": total_cards or len(cards),
+        "has_more": False,
+        "data": cards,
+    }
@@ -1,24 +1,22 @@
 import httpx
+from app.services.external.http_client import get_client
 
 LANGUAGE = "en"
-BASE_URL = "https://api.tcgdex.net/v2/"
+UPSTREAM = "tcgdex"
 
 
-async def fetch_extension():
-    async with httpx.AsyncClient() as client:
-        response = await client.get(f"{BASE_URL}{LANGUAGE}/sets/")
-    return response
+async def fetch_extension(client: httpx.AsyncClient | None = None):
+    client = client or get_client(UPSTREAM)
+    return await client.get(f"{LANGUAGE}/sets/")
 
 
-async def fetch_cards(extension: str):
-    async with httpx.AsyncClient() as client:
-        response = await client.get(f"{BASE_URL}{LANGUAGE}/sets/{extension}")
-    return response
+async def fetch_cards(extension: str, client: httpx.AsyncClient | None = None):
+    client = client or get_client(UPSTREAM)
+    return await client.get(f"{LANGUAGE}/sets/{extension}")
 
 
-async def fetch_card(extension: str, card: str):
-    async with httpx.AsyncClient() as client:
-        response = await client.get(
-            f"{BASE_URL}{LANGUAGE}/sets/{extension}/{card}"
-        )
-    return response
+async def fetch_card(
+    extension: str, card: str, client: httpx.AsyncClient | None = None
+):
+    client = client or get_client(UPSTREAM)
+    return await client.get(f"{LANGUAGE}/sets/{extension}/{card}")
@@ -1,18 +1,36 @@
-from typing import Optional, Any
+from typing import AsyncIterator, Optional, Any
 from app.services.external.magic import magic_api_services
 from app.services.standardized.magic import magic_standardized
+from app.services.external.single_flight import upstream_flight
+from app.services.catalog import catalog
 from fastapi import HTTPException
 
 
 async def fetch(
     extension: Optional[str] = None, collector_number: Optional[str] = None
+) -> Any:
+    # Answer from the local catalog mirror, upstream only on a miss
+    mirrored = await catalog.lookup("magic", extension, collector_number)
+    if mirrored:
+        return mirrored
+
+    # Concurrent identical lookups share one upstream call
+    return await upstream_flight.do(
+        ("magic", extension, collector_number),
+        lambda: _fetch_upstream(extension, collector_number),
+    )
+
+
+async def _fetch_upstream(
+    extension: Optional[str] = None, collector_number: Optional[str] = None
 ) -> Any:
     if extension and collector_number:
         response = await magic_api_services.fetch_card(
             extension, collector_number
         )
     elif extension:
-        response = await magic_api_services.fetch_cards(extension)
+        # Follow every search page, not just the first 175 cards
+        return await magic_api_services.fetch_all_cards(extension)
     elif extension:
         response = await magic_api_services.fetch_extension(extension)
     else:
@@ -38,3 +56,16 @@ async def fetch_and_standardized(
             status_code=500,
             detail=f"Fail to fetch extension or  data: {str(e)}",
         )
+
+
+async def stream_standardized(extension: str) -> AsyncIterator[dict]:
+    # Yield standardized cards page by page as Scryfall returns them
+    mirrored = await catalog.lookup("magic", extension)
+    if mirrored:
+        for card in magic_standardized.standardized_data_cards(mirrored):
+            yield card
+        return
+
+    async for page in magic_api_services.iter_card_pages(extension):
+        for card in magic_standardized.standardized_data_cards(page):
+            yield card
@@ -1,10 +1,26 @@
-from typing import Optional, Any
+from typing import AsyncIterator, Optional, Any
 from app.services.external.pokemon import pokemon_api_services
 from app.services.standardized.pokemon import pokemon_standardized
+from app.services.external.single_flight import upstream_flight
+from app.services.catalog import catalog
 
 
 async def fetch(
     extension: Optional[str] = None, card: Optional[str] = None
+) -> Any:
+    # Answer from the local catalog mirror, upstream only on a miss
+    mirrored = await catalog.lookup("pokemon", extension, card)
+    if mirrored:
+        return mirrored
+
+    # Concurrent identical lookups share one upstream call
+    return await upstream_flight.do(
+        ("pokemon", extension, card), lambda: _fetch_upstream(extension, card)
+    )
+
+
+async def _fetch_upstream(
+    extension: Optional[str] = None, card: Optional[str] = None
 ) -> Any:
     if extension and card:
         response = await pokemon_api_services.fetch_card(extension, card)
@@ -27,3 +43,13 @@ async def fetch_and_standardized(
         return None
 
     return pokemon_standardized.standardized(raw_data, extension, card)
+
+
+async def stream_standardized(extension: str) -> AsyncIterator[dict]:
+    # TCGdex returns a whole extension in one response
+    raw_data = await fetch(extension)
+    if not raw_data:
+        return
+
+    for card in pokemon_standardized.standardized(raw_data, extension):
+        yield card
@@ -1,3 +1,4 @@
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from dotenv import load_dotenv
@@ -14,13 +15,35 @@ from app.routers.auth import logout
 from app.routers.auth import register
 from app.routers.auth import delete_account
 from app.routers.auth import me
-from app.services.database.postgres.postgres import engine, Base
+from app.routers.auth import get_user
+from app.services.database.postgres import migrations
+from app.services.database.postgres.postgres import (
+    async_engine,
+    SessionLocal,
+)
+from app.services.cache.search_cache import search_cache
+from app.services.collections import counters
+from app.services.external import http_client
 
 # Load environment variables from .env file
 load_dotenv()
 
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Open pooled upstream clients once, close them on shutdown
+    await http_client.open_clients()
+    try:
+        yield
+    finally:
+        await http_client.close_clients()
+        await search_cache.close()
+        await get_user.sm_instance.close()
+        await async_engine.dispose()
+
+
 # Initialize FastAPI app
-app = FastAPI(redirect_slashes=True)
+app = FastAPI(redirect_slashes=True, lifespan=lifespan)
 
 # Configure CORS middleware to allow requests from the frontend
 app.add_middleware(
@@ -32,11 +55,13 @@ app.add_middleware(
 )
 
 
-# Create tables in the database
+# Bring the schema up to date (see backend/migrations)
 try:
-    Base.metadata.create_all(engine)
+    migrations.upgrade()
+    with SessionLocal() as db:
+        counters.reconcile_if_empty(db)
 except Exception as e:
-    print(f"Warning: Could not create tables at startup: {e}")
+    print(f"Warning: Could not migrate the database at startup: {e}")
 
 # Router
 app.include_router(dashboard.router, prefix="/api")
@@ -0,0 +1,54 @@
+from logging.config import fileConfig
+from alembic import context
+from sqlalchemy import create_engine
+from app.services.database.postgres import postgres
+
+# Register every model on Base.metadata (autogenerate compares them)
+from app.models import card, catalog, collection_counter  # noqa: F401
+from app.models import collections, user  # noqa: F401
+
+config = context.config
+target_metadata = postgres.Base.metadata
+
+# Logging only for the CLI, the API keeps its own configuration
+connection = config.attributes.get("connection")
+if config.config_file_name is not None and connection is None:
+    fileConfig(config.config_file_name)
+
+
+def run_migrations_offline() -> None:
+    # alembic upgrade head --sql: print the SQL instead of running it
+    context.configure(
+        url=postgres.db_url,
+        target_metadata=target_metadata,
+        literal_binds=True,
+        dialect_opts={"paramstyle": "named"},
+    )
+    with context.begin_transaction():
+        context.run_migrations()
+
+
+def run_migrations(connection) -> None:
+    context.configure(connection=connection, target_metadata=target_metadata)
+    with context.begin_transaction():
+        context.run_migrations()
+
+
+def run_migrations_online() -> None:
+    # The API passes its own connection (see postgres/migrations.py)
+    if connection is not None:
+        run_migrations(connection)
+        return
+
+    engine = create_engine(postgres.db_url)
+    try:
+        with engine.connect() as cli_connection:
+            run_migrations(cli_connection)
+    finally:
+        engine.dispose()
+
+
+if context.is_offline_mode():
+    run_migrations_offline()
+else:
+    run_migrations_online()
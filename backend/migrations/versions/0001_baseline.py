@@ -0,0 +1,126 @@
+"""Baseline: the schema previously created by Base.metadata.create_all
+
+Revision ID: 0001
+Revises:
+Create Date: 2026-10-18
+
+Existing databases already have these tables, so each one is only
+created when missing. Later revisions assume this exact shape.
+"""
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+revision = "0001"
+down_revision = None
+branch_labels = None
+depends_on = None
+
+UUID = postgresql.UUID(as_uuid=True)
+
+
+def _missing(table: str) -> bool:
+    return not sa.inspect(op.get_bind()).has_table(table)
+
+
+def upgrade() -> None:
+    if _missing("users"):
+        op.create_table(
+            "users",
+            sa.Column("id", UUID, nullable=False),
+            sa.Column("email", sa.String(), nullable=False),
+            sa.Column("username", sa.String(), nullable=False),
+            sa.Column("password", sa.String(), nullable=False),
+            sa.Column("created_at", sa.DateTime(), nullable=True),
+            sa.Column("updated_at", sa.DateTime(), nullable=True),
+            sa.PrimaryKeyConstraint("id"),
+            sa.UniqueConstraint("email"),
+            sa.UniqueConstraint("username"),
+        )
+
+    if _missing("cards"):
+        op.create_table(
+            "cards",
+            sa.Column("id", UUID, nullable=False),
+            sa.Column("card_id", sa.String(), nullable=False),
+            sa.Column("variant", sa.String(), nullable=False),
+            sa.Column("card_image", sa.String(), nullable=True),
+            sa.Column("extension_id", sa.String(), nullable=True),
+            sa.Column("card_number", sa.String(), nullable=True),
+            sa.Column("card_name", sa.String(), nullable=True),
+            sa.Column("added_at", sa.DateTime(), nullable=False),
+            sa.PrimaryKeyConstraint("id"),
+        )
+        op.create_index("ix_cards_card_id", "cards", ["card_id"], unique=True)
+
+    if _missing("collections"):
+        op.create_table(
+            "collections",
+            sa.Column("id", UUID, nullable=False),
+            sa.Column("user_id", UUID, nullable=False),
+            sa.Column("card_id", UUID, nullable=False),
+            sa.Column("variant", sa.String(), nullable=False),
+            sa.Column("quantity", sa.Integer(), nullable=False),
+            sa.Column("updated_at", sa.DateTime(), nullable=False),
+            sa.ForeignKeyConstraint(["card_id"], ["cards.id"]),
+            sa.ForeignKeyConstraint(["user_id"], ["users.id"]),
+            sa.PrimaryKeyConstraint("id"),
+        )
+
+    if _missing("catalog_extensions"):
+        op.create_table(
+            "catalog_extensions",
+            sa.Column("license", sa.String(), nullable=False),
+            sa.Column("extension_id", sa.String(), nullable=False),
+            sa.Column("name", sa.String(), nullable=True),
+            sa.Column("position", sa.Integer(), nullable=False),
+            sa.Column("payload", postgresql.JSONB(), nullable=False),
+            sa.Column("synced_at", sa.DateTime(), nullable=False),
+            sa.PrimaryKeyConstraint("license", "extension_id"),
+        )
+
+    if _missing("catalog_cards"):
+        op.create_table(
+            "catalog_cards",
+            sa.Column("license", sa.String(), nullable=False),
+            sa.Column("extension_id", sa.String(), nullable=False),
+            sa.Column("card_number", sa.String(), nullable=False),
+            sa.Column("name", sa.String(), nullable=True),
+            sa.Column("position", sa.Integer(), nullable=False),
+            sa.Column("detailed", sa.Boolean(), nullable=False),
+            sa.Column("payload", postgresql.JSONB(), nullable=False),
+            sa.Column("synced_at", sa.DateTime(), nullable=False),
+            sa.PrimaryKeyConstraint("license", "extension_id", "card_number"),
+        )
+        op.create_index(
+            "ix_catalog_cards_extension_name",
+            "catalog_cards",
+            ["license", "extension_id", "name"],
+        )
+
+    if _missing("collection_counters"):
+        op.create_table(
+            "collection_counters",
+            sa.Column("user_id", UUID, nullable=False),
+            sa.Column("scope", sa.String(), nullable=False),
+            sa.Column("key", sa.String(), nullable=False),
+            sa.Column("value", sa.BigInteger(), nullable=False),
+            sa.ForeignKeyConstraint(
+                ["user_id"], ["users.id"], ondelete="CASCADE"
+            ),
+            sa.PrimaryKeyConstraint("user_id", "scope", "key"),
+        )
+
+
+def downgrade() -> None:
+    op.drop_table("collection_counters")
+    op.drop_index(
+        "ix_catalog_cards_extension_name", table_name="catalog_cards"
+    )
+    op.drop_table("catalog_cards")
+    op.drop_table("catalog_extensions")
+    op.drop_table("collections")
+    op.drop_index("ix_cards_card_id", table_name="cards")
+    op.drop_table("cards")
+    op.drop_table("users")
@@ -0,0 +1,70 @@
+"""License and extension columns on cards, collection indexes
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-18
+
+cards.license replaces parsing card_id in Python, and extension_id is
+filled for rows stored without one: Pokémon ids embed the extension,
+Magic ids are matched against the local Scryfall catalog when synced.
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0002"
+down_revision = "0001"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column("cards", sa.Column("license", sa.String(), nullable=True))
+    op.execute("UPDATE cards SET license = split_part(card_id, '-', 1)")
+    op.alter_column("cards", "license", nullable=False)
+
+    # "pokemon-base1-1" -> "base1", as the listing fallback did
+    op.execute(
+        """
+        UPDATE cards
+        SET extension_id = substring(card_id FROM '^pokemon-(.+)-[^-]+$')
+        WHERE license = 'pokemon'
+          AND coalesce(extension_id, '') = ''
+        """
+    )
+    # "magic-<scryfall id>": the set is in the catalog payload
+    if sa.inspect(op.get_bind()).has_table("catalog_cards"):
+        op.execute(
+            """
+            UPDATE cards
+            SET extension_id = catalog_cards.extension_id
+            FROM catalog_cards
+            WHERE cards.license = 'magic'
+              AND coalesce(cards.extension_id, '') = ''
+              AND catalog_cards.license = 'magic'
+              AND catalog_cards.payload ->> 'id' = substr(cards.card_id, 7)
+            """
+        )
+
+    op.create_index(
+        "ix_cards_extension_license", "cards", ["extension_id", "license"]
+    )
+    op.create_index(
+        "ix_collections_user_card_variant",
+        "collections",
+        ["user_id", "card_id", "variant"],
+    )
+    op.create_index(
+        "ix_collections_user_updated",
+        "collections",
+        ["user_id", "updated_at", "id"],
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_collections_user_updated", table_name="collections")
+    op.drop_index(
+        "ix_collections_user_card_variant", table_name="collections"
+    )
+    op.drop_index("ix_cards_extension_license", table_name="cards")
+    op.drop_column("cards", "license")
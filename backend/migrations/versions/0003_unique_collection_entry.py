@@ -0,0 +1,68 @@
+"""One collection row per user, card and variant
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2026-10-18
+
+Concurrent adds could insert the same entry twice. Duplicates are
+merged into the most recent row (quantities summed) before the
+unique constraint replaces the plain index, which lets writes use
+INSERT ... ON CONFLICT.
+"""
+
+from alembic import op
+
+revision = "0003"
+down_revision = "0002"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.execute(
+        """
+        WITH ranked AS (
+            SELECT
+                id,
+                row_number() OVER entry AS position,
+                sum(quantity) OVER entry AS total
+            FROM collections
+            WINDOW entry AS (
+                PARTITION BY user_id, card_id, variant
+                ORDER BY updated_at DESC, id DESC
+                ROWS BETWEEN UNBOUNDED PRECEDING AND UNBOUNDED FOLLOWING
+            )
+        ),
+        kept AS (
+            UPDATE collections
+            SET quantity = ranked.total
+            FROM ranked
+            WHERE collections.id = ranked.id
+              AND ranked.position = 1
+              AND collections.quantity <> ranked.total
+        )
+        DELETE FROM collections
+        USING ranked
+        WHERE collections.id = ranked.id AND ranked.position > 1
+        """
+    )
+
+    op.drop_index(
+        "ix_collections_user_card_variant", table_name="collections"
+    )
+    op.create_unique_constraint(
+        "uq_collections_user_card_variant",
+        "collections",
+        ["user_id", "card_id", "variant"],
+    )
+
+
+def downgrade() -> None:
+    op.drop_constraint(
+        "uq_collections_user_card_variant", "collections", type_="unique"
+    )
+    op.create_index(
+        "ix_collections_user_card_variant",
+        "collections",
+        ["user_id", "card_id", "variant"],
+    )
@@ -0,0 +1,51 @@
+import os
+import uuid
+import pytest
+from dotenv import load_dotenv
+
+# Tests write, prune and delete rows: point them at their own database
+# before the engines are created from the environment
+load_dotenv()
+os.environ["DB_NAME"] = os.environ.get("TEST_DB_NAME", "cardvault_test")
+
+from sqlalchemy import delete  # noqa: E402
+from sqlalchemy.exc import OperationalError  # noqa: E402
+from sqlalchemy_utils import create_database, database_exists  # noqa: E402
+from app.models.collections import Collection  # noqa: E402
+from app.models.user import User  # noqa: E402
+from app.services.database.postgres import migrations, postgres  # noqa: E402
+
+
+@pytest.fixture(scope="session")
+def database():
+    # Create and migrate the test database, skip without a Postgres
+    try:
+        if not database_exists(postgres.db_url):
+            create_database(postgres.db_url, template="template0")
+        migrations.upgrade()
+    except OperationalError as e:
+        pytest.skip(f"Postgres is not reachable: {e}")
+
+
+@pytest.fixture
+def db(database):
+    session = postgres.SessionLocal()
+    try:
+        yield session
+    finally:
+        session.close()
+
+
+@pytest.fixture
+def user(db):
+    # Throwaway account, removed with its collection afterwards
+    name = f"test-{uuid.uuid4().hex}"
+    account = User(email=f"{name}@example.com", username=name, password="x")
+    db.add(account)
+    db.commit()
+    yield account
+
+    db.rollback()
+    db.execute(delete(Collection).where(Collection.user_id == account.id))
+    db.execute(delete(User).where(User.id == account.id))
+    db.commit()
@@ -0,0 +1,68 @@
+import asyncio
+import os
+from app.services import magic_service, pokemon_service
+from app.services.catalog import catalog, sync
+
+CATALOG_DIR = os.path.join(os.path.dirname(__file__), "fixtures", "catalog")
+
+
+def fixture_path(name: str) -> str:
+    return os.path.join(CATALOG_DIR, name)
+
+
+def no_upstream(*args, **kwargs):
+    raise AssertionError("upstream API called for a mirrored entry")
+
+
+def test_sync_magic_from_fixture_files(db, monkeypatch):
+    result = sync.sync_magic(
+        db,
+        sync.load_json(fixture_path("scryfall_sets.json")),
+        sync.iter_json_array(fixture_path("scryfall_default_cards.json")),
+    )
+
+    # The related_card object is skipped, the reprinted KHM 41 merged
+    assert result == {"extensions": 2, "cards": 3}
+
+    monkeypatch.setattr(magic_service, "_fetch_upstream", no_upstream)
+    card = asyncio.run(magic_service.fetch("LEA", "232"))
+    assert card["name"] == "Black Lotus"
+
+    listing = asyncio.run(magic_service.fetch("lea"))
+    assert [c["name"] for c in listing["data"]] == [
+        "Ancestral Recall",
+        "Black Lotus",
+    ]
+
+    extensions = asyncio.run(magic_service.fetch())
+    assert [e["code"] for e in extensions["data"]] == ["LEA", "KHM"]
+
+
+def test_sync_pokemon_from_fixture_files(db, monkeypatch):
+    result = sync.sync_pokemon(
+        db,
+        sync.load_json(fixture_path("tcgdex_sets.json")),
+        sync.load_json(fixture_path("tcgdex_cards.json")),
+    )
+    assert result == {"extensions": 2, "cards": 3}
+
+    monkeypatch.setattr(pokemon_service, "_fetch_upstream", no_upstream)
+    extension = asyncio.run(pokemon_service.fetch("base1"))
+    assert extension["name"] == "Base Set"
+    assert [c["name"] for c in extension["cards"]] == [
+        "Charizard",
+        "Blastoise",
+    ]
+
+    # List summaries cannot answer a single card lookup
+    assert asyncio.run(catalog.lookup("pokemon", "base1", "4")) is None
+
+
+def test_sync_prunes_entries_gone_upstream(db):
+    sets = sync.load_json(fixture_path("tcgdex_sets.json"))
+    cards = sync.load_json(fixture_path("tcgdex_cards.json"))
+    sync.sync_pokemon(db, sets, cards)
+
+    result = sync.sync_pokemon(db, sets[:1], cards[:2])
+    assert result == {"extensions": 1, "cards": 2}
+    assert asyncio.run(catalog.lookup("pokemon", "sv03.5")) is None
@@ -0,0 +1,79 @@
+import threading
+from sqlalchemy import select
+from app.models.collections import Collection
+from app.services.collections.collection import CollectionService
+from app.services.database.postgres import postgres
+
+CARD = "pokemon-base1-4"
+ROUNDS = 30
+
+
+def run_together(*calls):
+    # Run each call on its own session and thread, released at once.
+    # Returns what each call returned, or the exception it raised
+    barrier = threading.Barrier(len(calls))
+    results = [None] * len(calls)
+
+    def worker(index, call):
+        session = postgres.SessionLocal()
+        try:
+            barrier.wait()
+            results[index] = call(CollectionService(session))
+        except Exception as e:
+            results[index] = e
+        finally:
+            session.close()
+
+    threads = [
+        threading.Thread(target=worker, args=(index, call))
+        for index, call in enumerate(calls)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return results
+
+
+def quantity(db, user_id):
+    db.rollback()  # fresh snapshot
+    return db.scalar(
+        select(Collection.quantity).where(Collection.user_id == user_id)
+    )
+
+
+def test_concurrent_add_and_remove_of_one_entry(db, user):
+    user_id = user.id
+    service = CollectionService(db)
+    service.add_card_to_collection(user_id, CARD, "normal", 1)
+
+    for _ in range(ROUNDS):
+        added, removed = run_together(
+            lambda s: s.add_card_to_collection(user_id, CARD, "normal", 1),
+            lambda s: s.add_card_to_collection(user_id, CARD, "normal", -1),
+        )
+        # Whichever goes first, both apply and one copy is left
+        assert not isinstance(added, Exception), added
+        assert not isinstance(removed, Exception), removed
+        assert quantity(db, user_id) == 1
+
+    assert service.get_total_cards(user_id) == 1
+
+
+def test_concurrent_removals_of_the_last_copy(db, user):
+    user_id = user.id
+    service = CollectionService(db)
+
+    for _ in range(ROUNDS):
+        service.add_card_to_collection(user_id, CARD, "normal", 1)
+        results = run_together(
+            lambda s: s.add_card_to_collection(user_id, CARD, "normal", -1),
+            lambda s: s.add_card_to_collection(user_id, CARD, "normal", -1),
+        )
+        # Exactly one removal wins, the entry is gone, not negative
+        errors = [r for r in results if isinstance(r, Exception)]
+        assert len(errors) == 1, results
+        assert isinstance(errors[0], ValueError)
+        assert quantity(db, user_id) is None
+
+    assert service.get_total_cards(user_id) == 0
@@ -0,0 +1,62 @@
+from contextlib import contextmanager
+from sqlalchemy import event
+from app.schemas.collection import CollectionCreate
+from app.services.collections.collection import CollectionService
+from app.services.database.postgres import postgres
+
+
+@contextmanager
+def count_queries():
+    statements = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    event.listen(postgres.engine, "before_cursor_execute", record)
+    try:
+        yield statements
+    finally:
+        event.remove(postgres.engine, "before_cursor_execute", record)
+
+
+def add(service, user, *items):
+    service.apply_batch(
+        user.id,
+        [
+            CollectionCreate(card_id=card_id, variant=variant, quantity=qty)
+            for card_id, variant, qty in items
+        ],
+    )
+
+
+def test_stats_are_one_query(db, user):
+    service = CollectionService(db)
+    add(
+        service,
+        user,
+        ("pokemon-base1-4", "normal", 2),
+        ("pokemon-base1-4", "holo", 1),
+        ("pokemon-base1-2", "normal", 1),
+        ("magic-lea-232", "normal", 3),
+    )
+
+    user_id = user.id  # loaded now, not inside the counted block
+    with count_queries() as statements:
+        stats = service.get_stats(user_id)
+
+    assert len(statements) == 1, statements
+    assert stats["total_cards"] == 7
+    assert stats["unique_cards"] == 3
+    assert stats["by_license"] == {"pokemon": 4, "magic": 3}
+    assert stats["by_variant"] == {"normal": 6, "holo": 1}
+    assert stats["last_card"] is not None
+
+
+def test_stats_of_an_empty_collection_are_one_query(db, user):
+    user_id = user.id
+    with count_queries() as statements:
+        stats = CollectionService(db).get_stats(user_id)
+
+    assert len(statements) == 1, statements
+    assert stats["total_cards"] == 0
+    assert stats["last_card"] is None
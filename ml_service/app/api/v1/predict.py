@@ -1,21 +1,112 @@
-from fastapi import APIRouter, HTTPException
+import asyncio
+import os
+from fastapi import APIRouter, Depends, File, HTTPException, UploadFile
 from pydantic import BaseModel
-from app.models.model import search_card
+from starlette.concurrency import run_in_threadpool
+from app.models.batcher import batcher
+from app.models.enrichment import enricher
+from app.models.model import load_image
+from app.models.predict_cache import content_key, dhash, predict_cache
+from app.models.startup import startup
 import base64
 
-router = APIRouter(tags=["predict"])
+
+def require_ready():
+    # Refuse early instead of queueing behind model or index loading
+    if not startup.ready:
+        raise HTTPException(
+            status_code=503,
+            detail=f"Model is starting ({startup.phase})",
+            headers={"Retry-After": "5"},
+        )
+
+
+router = APIRouter(tags=["predict"], dependencies=[Depends(require_ready)])
+
+# Binder pages hold 9 cards, leave some headroom
+PREDICT_BATCH_MAX_IMAGES = int(os.getenv("PREDICT_BATCH_MAX_IMAGES", "16"))
 
 
 class PredictRequest(BaseModel):
     image: str
 
 
+class InvalidImageError(ValueError):
+    pass
+
+
+async def match_image(data: bytes) -> list:
+    # Rescans of the same photo skip decoding and inference
+    key = content_key(data)
+    entry = await predict_cache.get(key)
+    if entry is not None:
+        return await predict_cache.matches(entry)
+
+    try:
+        image = await run_in_threadpool(load_image, data)
+    except Exception as e:
+        raise InvalidImageError(str(e))
+
+    phash = None
+    if predict_cache.phash:
+        phash = dhash(image)
+        entry = predict_cache.get_similar(phash)
+        if entry is not None:
+            return await predict_cache.matches(entry)
+
+    predict_cache.miss()
+    # Concurrent requests share one model pass and index search
+    matches, embedding = await batcher.submit(image)
+    await predict_cache.put(key, embedding, matches, phash)
+    return matches
+
+
 @router.post("/predict")
-async def post_prediction(body: PredictRequest):
+async def post_prediction(body: PredictRequest, enrich: bool = True):
     try:
         b64 = body.image.split(",", 1)[-1]
         image_data = base64.b64decode(b64)
-        results = search_card(image_data)
-        return results
+        matches = await match_image(image_data)
+        # Raw matches (card id + score) skip the backend round trips
+        if not enrich:
+            return matches
+        return await enricher.enrich(matches)
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
+
+
+@router.post("/predict/batch")
+async def post_batch_prediction(
+    files: list[UploadFile] = File(...), enrich: bool = True
+):
+    # One result list per uploaded image, in upload order
+    if len(files) > PREDICT_BATCH_MAX_IMAGES:
+        raise HTTPException(
+            status_code=413,
+            detail=f"Too many images (max {PREDICT_BATCH_MAX_IMAGES})",
+        )
+
+    async def match_upload(upload: UploadFile) -> list:
+        try:
+            return await match_image(await upload.read())
+        except InvalidImageError as e:
+            raise HTTPException(
+                status_code=400,
+                detail=f"Invalid image '{upload.filename}': {e}",
+            )
+
+    try:
+        # Queued together, the images land in the same model batch
+        matches = await asyncio.gather(*(match_upload(f) for f in files))
+        if not enrich:
+            return matches
+        return await asyncio.gather(*(enricher.enrich(m) for m in matches))
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@router.get("/predict/cache")
+async def get_predict_cache():
+    return predict_cache.stats()
@@ -0,0 +1,12 @@
+from fastapi import APIRouter
+from fastapi.responses import JSONResponse
+from app.models.startup import startup
+
+router = APIRouter(tags=["ready"])
+
+
+@router.get("/ready")
+async def get_ready():
+    # 503 until the model is warm and the index is loaded
+    status_code = 200 if startup.ready else 503
+    return JSONResponse(startup.status(), status_code=status_code)
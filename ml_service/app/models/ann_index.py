@@ -0,0 +1,162 @@
+import json
+import math
+import os
+from pathlib import Path
+import faiss
+import numpy as np
+
+# Index family used for card recognition: flat, ivf_flat, hnsw, ivf_pq
+INDEX_TYPE = os.getenv("INDEX_TYPE", "flat").lower()
+INDEX_TYPES = ("flat", "ivf_flat", "hnsw", "ivf_pq")
+IVF_TYPES = ("ivf_flat", "ivf_pq")
+# Types that keep lossy codes only, their vectors cannot be recovered
+LOSSY_TYPES = ("ivf_pq",)
+# IVF: number of clusters (0 picks one from the corpus size) and how
+# many of them are scanned per query
+IVF_NLIST = int(os.getenv("IVF_NLIST", "0"))
+IVF_NPROBE = int(os.getenv("IVF_NPROBE", "16"))
+# HNSW: graph degree and build / search beam widths
+HNSW_M = int(os.getenv("HNSW_M", "32"))
+HNSW_EF_CONSTRUCTION = int(os.getenv("HNSW_EF_CONSTRUCTION", "200"))
+HNSW_EF_SEARCH = int(os.getenv("HNSW_EF_SEARCH", "64"))
+# PQ: sub-quantizers (must divide the dimension) and bits per code
+PQ_M = int(os.getenv("PQ_M", "48"))
+PQ_NBITS = int(os.getenv("PQ_NBITS", "8"))
+# Upper bound on vectors used to train IVF / PQ quantizers
+TRAIN_SAMPLE = int(os.getenv("INDEX_TRAIN_SAMPLE", "100000"))
+
+
+def index_params(index_type: str = INDEX_TYPE, **overrides) -> dict:
+    # Parameters for the given index type, env values as defaults
+    if index_type not in INDEX_TYPES:
+        raise ValueError(
+            f"Unknown index type '{index_type}', expected {INDEX_TYPES}"
+        )
+
+    params = {"index_type": index_type}
+    if index_type in IVF_TYPES:
+        params.update(nlist=IVF_NLIST, nprobe=IVF_NPROBE)
+    if index_type == "ivf_pq":
+        params.update(pq_m=PQ_M, pq_nbits=PQ_NBITS)
+    if index_type == "hnsw":
+        params.update(
+            m=HNSW_M,
+            ef_construction=HNSW_EF_CONSTRUCTION,
+            ef_search=HNSW_EF_SEARCH,
+        )
+    params.update(overrides)
+    return params
+
+
+def _nlist_for(n_vectors: int, nlist: int) -> int:
+    # ~4*sqrt(n) clusters, with at least 39 training points per cluster
+    if nlist <= 0:
+        nlist = int(4 * math.sqrt(n_vectors))
+    return max(1, min(nlist, n_vectors // 39))
+
+
+def create_index(dim: int, params: dict, n_vectors: int):
+    index_type = params["index_type"]
+    metric = faiss.METRIC_INNER_PRODUCT
+
+    if index_type == "flat":
+        return faiss.IndexFlatIP(dim)
+
+    if index_type == "hnsw":
+        index = faiss.IndexHNSWFlat(dim, params["m"], metric)
+        index.hnsw.efConstruction = params["ef_construction"]
+        return index
+
+    # The chosen nlist is written back so it lands in the params file
+    params["nlist"] = _nlist_for(n_vectors, params["nlist"])
+    quantizer = faiss.IndexFlatIP(dim)
+    if index_type == "ivf_flat":
+        return faiss.IndexIVFFlat(quantizer, dim, params["nlist"], metric)
+
+    if dim % params["pq_m"] != 0:
+        raise ValueError(
+            f"PQ_M={params['pq_m']} must divide the dimension {dim}"
+        )
+    return faiss.IndexIVFPQ(
+        quantizer,
+        dim,
+        params["nlist"],
+        params["pq_m"],
+        params["pq_nbits"],
+        metric,
+    )
+
+
+def apply_search_params(index, params: dict) -> None:
+    # Search-time knobs are not all persisted by faiss, set on load.
+    # Each one only exists on its own index family
+    index_type = params["index_type"]
+    if index_type in IVF_TYPES and "nprobe" in params:
+        faiss.extract_index_ivf(index).nprobe = params["nprobe"]
+    if index_type == "hnsw" and "ef_search" in params:
+        index.hnsw.efSearch = params["ef_search"]
+
+
+def build(embeddings: np.ndarray, params: dict):
+    # Create, train and fill an index from L2-normalised embeddings
+    embeddings = np.ascontiguousarray(embeddings, dtype="float32")
+    n_vectors, dim = embeddings.shape
+    index = create_index(dim, params, n_vectors)
+
+    if not index.is_trained:
+        sample = embeddings
+        if n_vectors > TRAIN_SAMPLE:
+            rng = np.random.default_rng(0)
+            picked = rng.choice(n_vectors, TRAIN_SAMPLE, replace=False)
+            sample = embeddings[np.sort(picked)]
+        print(f"Training {params['index_type']} on {len(sample)} vectors")
+        index.train(sample)
+
+    index.add(embeddings)
+    apply_search_params(index, params)
+    return index
+
+
+def stored_vectors(index) -> np.ndarray:
+    # Exact vectors kept by an index, in insertion order. Flat, HNSW
+    # and IVF-flat store them as is, IVF-PQ only keeps lossy codes
+    if isinstance(index, faiss.IndexIVFFlat):
+        index.make_direct_map()
+    elif not isinstance(index, (faiss.IndexFlat, faiss.IndexHNSWFlat)):
+        raise ValueError(
+            f"Exact vectors cannot be recovered from {type(index).__name__}"
+        )
+    return index.reconstruct_n(0, index.ntotal)
+
+
+def save_params(path: Path, params: dict, index) -> None:
+    data = dict(params, dim=index.d, ntotal=index.ntotal)
+    tmp_path = path.with_name(path.name + ".tmp")
+    with open(str(tmp_path), "w", encoding="utf-8") as f:
+        json.dump(data, f, indent=2)
+    os.replace(str(tmp_path), str(path))
+
+
+def load_params(path: Path) -> dict:
+    # Indexes without a params file predate this option and are flat
+    if not os.path.exists(str(path)):
+        return {"index_type": "flat"}
+    with open(str(path), "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def search_overrides(index_type: str) -> dict:
+    # Search knobs explicitly set in the environment win over the file,
+    # when they apply to the index type on disk
+    overrides = {}
+    if "IVF_NPROBE" in os.environ:
+        if index_type in IVF_TYPES:
+            overrides["nprobe"] = IVF_NPROBE
+        else:
+            print(f"IVF_NPROBE ignored, the index is {index_type}")
+    if "HNSW_EF_SEARCH" in os.environ:
+        if index_type == "hnsw":
+            overrides["ef_search"] = HNSW_EF_SEARCH
+        else:
+            print(f"HNSW_EF_SEARCH ignored, the index is {index_type}")
+    return overrides
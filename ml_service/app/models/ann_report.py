@@ -0,0 +1,114 @@
+"""Compare ANN index settings against the exact flat index.
+
+Run from the ml_service directory:
+
+    python -m app.models.ann_report [--queries 1000] [--k 3]
+
+Vectors are read back from the flat index (cards_index.faiss or
+--flat). Queries are indexed cards with a little noise added, standing
+in for photos of known cards. For every setting the report prints
+recall@k against the exact top-k, per-query latency (one query per
+search, i.e. without micro-batching) and the index size.
+"""
+
+import argparse
+import json
+import time
+from pathlib import Path
+import faiss
+import numpy as np
+from app.models import ann_index
+
+DEFAULT_FLAT = Path(__file__).parent / "data_cache" / "cards_index.faiss"
+
+# Settings tried for each index type; the search knob is swept
+# without rebuilding
+SWEEPS = {
+    "flat": [{}],
+    "ivf_flat": [{"nprobe": n} for n in (1, 4, 8, 16, 32, 64)],
+    "hnsw": [{"ef_search": ef} for ef in (16, 32, 64, 128, 256)],
+    "ivf_pq": [{"nprobe": n} for n in (4, 16, 32, 64)],
+}
+
+
+def make_queries(vectors: np.ndarray, count: int, noise: float):
+    rng = np.random.default_rng(0)
+    picked = rng.choice(len(vectors), min(count, len(vectors)), False)
+    queries = vectors[picked] + rng.normal(
+        0, noise, (len(picked), vectors.shape[1])
+    ).astype("float32")
+    queries = np.ascontiguousarray(queries, dtype="float32")
+    faiss.normalize_L2(queries)
+    return queries
+
+
+def recall_at_k(found: np.ndarray, truth: np.ndarray) -> float:
+    # Share of the exact top-k that the index also returned
+    hits = sum(len(set(f) & set(t)) for f, t in zip(found, truth))
+    return hits / truth.size
+
+
+def measure(index, queries: np.ndarray, truth: np.ndarray, k: int):
+    latencies = []
+    found = np.empty((len(queries), k), dtype="int64")
+    for i, query in enumerate(queries):
+        start = time.perf_counter()
+        _, indices = index.search(query[None, :], k)
+        latencies.append(time.perf_counter() - start)
+        found[i] = indices[0]
+
+    latencies = np.array(latencies) * 1000
+    return {
+        f"recall@{k}": round(recall_at_k(found, truth), 4),
+        "p50_ms": round(float(np.percentile(latencies, 50)), 3),
+        "p95_ms": round(float(np.percentile(latencies, 95)), 3),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="ANN recall/latency")
+    parser.add_argument("--flat", default=str(DEFAULT_FLAT))
+    parser.add_argument("--types", default=",".join(ann_index.INDEX_TYPES))
+    parser.add_argument("--queries", type=int, default=1000)
+    parser.add_argument("--k", type=int, default=3)
+    parser.add_argument("--noise", type=float, default=0.02)
+    parser.add_argument("--json", help="Also write the rows to this file")
+    args = parser.parse_args()
+
+    # Single-threaded searches keep the timings comparable
+    faiss.omp_set_num_threads(1)
+
+    vectors = ann_index.stored_vectors(faiss.read_index(args.flat))
+    queries = make_queries(vectors, args.queries, args.noise)
+    reference = faiss.IndexFlatIP(vectors.shape[1])
+    reference.add(vectors)
+    _, truth = reference.search(queries, args.k)
+    print(f"{len(vectors)} vectors, {len(queries)} queries, k={args.k}")
+
+    rows = []
+    for index_type in args.types.split(","):
+        params = ann_index.index_params(index_type)
+        start = time.perf_counter()
+        index = ann_index.build(vectors, params)
+        build_s = round(time.perf_counter() - start, 2)
+        size_mb = round(faiss.serialize_index(index).nbytes / 2**20, 1)
+
+        for search in SWEEPS[index_type]:
+            params.update(search)
+            ann_index.apply_search_params(index, params)
+            row = dict(
+                params,
+                **measure(index, queries, truth, args.k),
+                build_s=build_s,
+                size_mb=size_mb,
+            )
+            rows.append(row)
+            print(json.dumps(row))
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(rows, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,84 @@
+import asyncio
+import os
+from starlette.concurrency import run_in_threadpool
+from app.models.model import match_embedded
+
+# Largest batch sent to the model, and how long to wait to fill it
+INFERENCE_BATCH_SIZE = int(os.getenv("INFERENCE_BATCH_SIZE", "16"))
+INFERENCE_BATCH_WAIT_MS = float(os.getenv("INFERENCE_BATCH_WAIT_MS", "5"))
+
+
+class InferenceBatcher:
+    def __init__(
+        self,
+        max_batch_size: int = INFERENCE_BATCH_SIZE,
+        max_wait_ms: float = INFERENCE_BATCH_WAIT_MS,
+    ):
+        self.max_batch_size = max(1, max_batch_size)
+        self.max_wait = max_wait_ms / 1000
+        self._queue: asyncio.Queue | None = None
+        self._worker: asyncio.Task | None = None
+
+    def start(self):
+        if self._worker is None or self._worker.done():
+            self._queue = asyncio.Queue()
+            self._worker = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._worker is not None:
+            self._worker.cancel()
+            try:
+                await self._worker
+            except asyncio.CancelledError:
+                pass
+            self._worker = None
+
+    async def submit(self, image) -> tuple:
+        # Queue one decoded image and wait for (matches, embedding)
+        self.start()
+        future = asyncio.get_running_loop().create_future()
+        await self._queue.put((image, future))
+        return await future
+
+    async def _collect(self) -> list:
+        # Wait for a first request, then fill up until size or deadline
+        batch = [await self._queue.get()]
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + self.max_wait
+
+        while len(batch) < self.max_batch_size:
+            timeout = deadline - loop.time()
+            if timeout <= 0:
+                break
+            try:
+                batch.append(
+                    await asyncio.wait_for(self._queue.get(), timeout)
+                )
+            except asyncio.TimeoutError:
+                break
+        return batch
+
+    async def _run(self):
+        while True:
+            batch = await self._collect()
+            images = [image for image, _ in batch]
+
+            try:
+                results, embeddings = await run_in_threadpool(
+                    match_embedded, images
+                )
+            except Exception as e:
+                for _, future in batch:
+                    if not future.done():
+                        future.set_exception(e)
+                continue
+
+            # Split the batched search back per caller
+            for (_, future), matches, embedding in zip(
+                batch, results, embeddings
+            ):
+                if not future.done():
+                    future.set_result((matches, embedding))
+
+
+batcher = InferenceBatcher()
@@ -0,0 +1,105 @@
+import asyncio
+import os
+import time
+from collections import OrderedDict
+import httpx
+from app.models.model import BACKEND_URL
+
+# Per-call timeout and deadline for enriching a whole result list
+ENRICH_TIMEOUT = float(os.getenv("ENRICH_TIMEOUT", "2"))
+ENRICH_DEADLINE = float(os.getenv("ENRICH_DEADLINE", "2.5"))
+ENRICH_MAX_CONNECTIONS = int(os.getenv("ENRICH_MAX_CONNECTIONS", "20"))
+# Card details barely change, keep them per card id
+ENRICH_CACHE_TTL = float(os.getenv("ENRICH_CACHE_TTL", "3600"))
+ENRICH_CACHE_SIZE = int(os.getenv("ENRICH_CACHE_SIZE", "4096"))
+
+
+class Enricher:
+    def __init__(self):
+        self.client: httpx.AsyncClient | None = None
+        self._cache: OrderedDict = OrderedDict()
+
+    def open(self):
+        if self.client is None or self.client.is_closed:
+            self.client = httpx.AsyncClient(
+                base_url=BACKEND_URL,
+                timeout=ENRICH_TIMEOUT,
+                limits=httpx.Limits(max_connections=ENRICH_MAX_CONNECTIONS),
+            )
+
+    async def close(self):
+        if self.client is not None:
+            await self.client.aclose()
+            self.client = None
+
+    def _cached(self, card_id: str):
+        entry = self._cache.get(card_id)
+        if entry is None:
+            return None
+        expires_at, data = entry
+        if expires_at < time.monotonic():
+            del self._cache[card_id]
+            return None
+        self._cache.move_to_end(card_id)
+        return data
+
+    def _store(self, card_id: str, data) -> None:
+        self._cache[card_id] = (time.monotonic() + ENRICH_CACHE_TTL, data)
+        self._cache.move_to_end(card_id)
+        while len(self._cache) > ENRICH_CACHE_SIZE:
+            self._cache.popitem(last=False)
+
+    async def fetch_card(self, card_id: str):
+        # Backend card details, cached by card id
+        data = self._cached(card_id)
+        if data is not None:
+            return data
+
+        self.open()
+        formatted_id = card_id.replace("-", "/")
+        response = await self.client.get(
+            f"/api/search/pokemon/{formatted_id}"
+        )
+        response.raise_for_status()
+        data = response.json()
+        self._store(card_id, data)
+        return data
+
+    async def enrich(self, matches: list) -> list:
+        # Fetch every match concurrently under one total deadline
+        tasks = [
+            asyncio.create_task(self.fetch_card(match["card_id"]))
+            for match in matches
+        ]
+        if tasks:
+            _, pending = await asyncio.wait(tasks, timeout=ENRICH_DEADLINE)
+            for task in pending:
+                task.cancel()
+
+        results = []
+        for match, task in zip(matches, tasks):
+            card_id, score = match["card_id"], match["score"]
+
+            if task.done() and not task.cancelled() and not task.exception():
+                results.append(
+                    {"score": round(score, 4), "data": task.result()}
+                )
+                continue
+
+            if not task.done() or task.cancelled():
+                error = "deadline exceeded"
+            else:
+                error = task.exception()
+            print(f"API error for ID {card_id}: {error}")
+            results.append(
+                {
+                    "score": score,
+                    "card_id": card_id,
+                    "error": "API Unreachable",
+                }
+            )
+
+        return results
+
+
+enricher = Enricher()
@@ -0,0 +1,449 @@
+"""Build or extend the card index from the Hugging Face dataset.
+
+Run from the ml_service directory to add new cards to the local index:
+
+    python -m app.models.index_build [--full]
+
+Only cards whose id_card is not indexed yet are decoded and embedded.
+The index and metadata are checkpointed every CHECKPOINT_EVERY
+batches, and an interrupted build resumes from its last checkpoint.
+--full discards the local index and re-embeds the whole dataset.
+
+Decoding and preprocessing run in INDEX_BUILD_WORKERS processes while
+this process runs the model, and images/sec per stage is printed at
+the end to show which stage bounds the build.
+"""
+
+import argparse
+import json
+import multiprocessing
+import os
+import time
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor
+from app.models import metadata_store, preprocess
+from app.models.model import (
+    DATA_DIR,
+    HF_DATASET_ID,
+    INDEX_FILE,
+    METADATA_FILE,
+    MODEL_NAME,
+    NAMES_FILE,
+    PARAMS_FILE,
+    embed_pixels,
+)
+
+BATCH_SIZE = int(os.getenv("INDEX_BUILD_BATCH_SIZE", "128"))
+# Processes decoding and preprocessing images, 0 runs them inline
+WORKERS = int(
+    os.getenv("INDEX_BUILD_WORKERS", str(max(1, (os.cpu_count() or 2) - 1)))
+)
+# Batches preprocessed ahead of inference, which bounds memory use.
+# A batch is BATCH_SIZE x 3 x 224 x 224 float32, ~77 MB at 128, and is
+# pickled back from its worker: up to PREFETCH of them wait here, and
+# a worker briefly holds two copies while sending one. The default
+# keeps every worker busy with one batch ready for the model, ~0.4 GB
+# with 4 workers
+PREFETCH = max(1, int(os.getenv("INDEX_BUILD_PREFETCH", str(WORKERS + 1))))
+# Batches between two checkpoints of the index and metadata
+CHECKPOINT_EVERY = int(os.getenv("INDEX_CHECKPOINT_EVERY", "20"))
+# Progress of the last build, to resume after a crash
+STATE_FILE = DATA_DIR / "build_state.json"
+
+
+# ---------- Files ---------- #
+
+
+def _atomic_write(path, write) -> None:
+    # Write next to the target then rename, readers never see half
+    # a file and a crash leaves the previous checkpoint intact
+    tmp_path = path.with_name(path.name + ".tmp")
+    write(str(tmp_path))
+    os.replace(str(tmp_path), str(path))
+
+
+def load_state() -> dict:
+    if not os.path.exists(str(STATE_FILE)):
+        return {}
+    with open(str(STATE_FILE), "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def _write_json(data: dict):
+    def write(path):
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(data, f, indent=2)
+
+    return write
+
+
+def load_local():
+    import faiss
+
+    # Index and metadata on disk, (None, []) when there is none
+    if not _has_local_files():
+        return None, []
+    index = faiss.read_index(str(INDEX_FILE))
+    metadata = list(metadata_store.load(METADATA_FILE, NAMES_FILE))
+
+    # Metadata is saved first, drop rows whose vectors never made it
+    if len(metadata) > index.ntotal:
+        metadata = metadata[: index.ntotal]
+    if len(metadata) < index.ntotal:
+        raise RuntimeError(
+            f"Index has {index.ntotal} vectors for {len(metadata)} cards"
+        )
+    return index, metadata
+
+
+def save_checkpoint(index, metadata: list, state: dict) -> None:
+    import faiss
+    from app.models import ann_index
+
+    os.makedirs(str(DATA_DIR), exist_ok=True)
+    # A trained index keeps its parameters, a working index is flat
+    params = {"index_type": "flat"}
+    if not isinstance(index, faiss.IndexFlat):
+        params = ann_index.load_params(PARAMS_FILE)
+
+    metadata_store.write(METADATA_FILE, metadata)
+    _atomic_write(INDEX_FILE, lambda path: faiss.write_index(index, path))
+    ann_index.save_params(PARAMS_FILE, params, index)
+    _atomic_write(STATE_FILE, _write_json(state))
+
+
+def _has_local_files() -> bool:
+    return os.path.exists(str(INDEX_FILE)) and (
+        os.path.exists(str(METADATA_FILE)) or os.path.exists(str(NAMES_FILE))
+    )
+
+
+def discard_local() -> None:
+    files = (INDEX_FILE, METADATA_FILE, NAMES_FILE, PARAMS_FILE, STATE_FILE)
+    for path in files:
+        if os.path.exists(str(path)):
+            os.remove(str(path))
+
+
+# ---------- Build ---------- #
+
+
+def needs_build() -> str | None:
+    # Why the local index cannot be served as is, None when it can
+    from app.models import ann_index
+
+    if not _has_local_files():
+        return "no local index"
+    if load_state().get("status") == "in_progress":
+        return "resuming an interrupted build"
+    if ann_index.load_params(PARAMS_FILE)["index_type"] != (
+        ann_index.INDEX_TYPE
+    ):
+        return f"INDEX_TYPE changed to {ann_index.INDEX_TYPE}"
+    return None
+
+
+def download_published() -> bool:
+    from huggingface_hub import hf_hub_download
+
+    try:
+        print("Research index on HF")
+        for filename in ("cards_index.faiss", "cards_metadata.npy"):
+            hf_hub_download(
+                repo_id=HF_DATASET_ID,
+                filename=filename,
+                repo_type="dataset",
+                local_dir=str(DATA_DIR),
+            )
+    except Exception as e:
+        print(f"No index found online ({e}). Building local index")
+        return False
+
+    print("Index loaded from HF")
+    # The published index replaces whatever was there, flat params
+    if os.path.exists(str(PARAMS_FILE)):
+        os.remove(str(PARAMS_FILE))
+    metadata_store.migrate(NAMES_FILE, METADATA_FILE)
+    return True
+
+
+def convert_index():
+    import faiss
+    from app.models import ann_index
+
+    # Rebuild the index on disk as the configured type from its stored
+    # vectors instead of re-embedding the dataset
+    index = faiss.read_index(str(INDEX_FILE))
+    local_type = ann_index.load_params(PARAMS_FILE)["index_type"]
+    params = ann_index.index_params()
+    if params["index_type"] != local_type:
+        vectors = ann_index.stored_vectors(index)
+        print(f"Converting index from {local_type} to {params['index_type']}")
+        index = ann_index.build(vectors, params)
+        _atomic_write(INDEX_FILE, lambda path: faiss.write_index(index, path))
+    ann_index.save_params(PARAMS_FILE, params, index)
+
+
+class _StageStats:
+    # Busy seconds per stage, to see which one bounds the build
+    def __init__(self, workers: int):
+        self.workers = max(1, workers)
+        self.rows = 0
+        self.images = 0
+        self.read = 0.0
+        self.decode = 0.0
+        self.preprocess = 0.0
+        self.inference = 0.0
+        self.wait = 0.0
+        self._started_at = time.perf_counter()
+
+    def report(self) -> dict:
+        def rate(count, seconds, parallel=1):
+            return round(count * parallel / seconds, 1) if seconds else None
+
+        # Decode and preprocess run on every worker at once
+        return {
+            "read_rows_per_s": rate(self.rows, self.read),
+            "decode_img_per_s": rate(
+                self.images, self.decode, self.workers
+            ),
+            "preprocess_img_per_s": rate(
+                self.images, self.preprocess, self.workers
+            ),
+            "inference_img_per_s": rate(self.images, self.inference),
+            "overall_img_per_s": rate(
+                self.images, time.perf_counter() - self._started_at
+            ),
+            # Time inference sat idle waiting for the workers
+            "inference_wait_s": round(self.wait, 2),
+        }
+
+
+class _Build:
+    def __init__(self, checkpoint_every: int, workers: int):
+        self.checkpoint_every = checkpoint_every
+        self.workers = workers
+        self.index, self.metadata = load_local()
+        self.known = {card["id"] for card in self.metadata}
+        self.rows_seen = 0
+        self.added = self.failed = self.batches = 0
+        self.stats = _StageStats(workers)
+
+    def _dataset(self):
+        from datasets import Image as ImageFeature, load_dataset
+
+        # Resume where an interrupted build stopped, otherwise scan the
+        # whole dataset (new cards are not necessarily at the end)
+        state = load_state()
+        if state.get("status") == "in_progress":
+            self.rows_seen = state.get("rows_seen", 0)
+            print(f"Resuming build after {self.rows_seen} dataset rows")
+
+        ds = load_dataset(HF_DATASET_ID, split="train", streaming=True)
+        # Decode only the images of cards that still need embedding
+        ds = ds.cast_column("image", ImageFeature(decode=False))
+        if self.rows_seen:
+            ds = ds.skip(self.rows_seen)
+        return ds
+
+    def _read(self):
+        # Yield (rows seen so far, new cards) for every dataset batch
+        batches = iter(self._dataset().iter(batch_size=BATCH_SIZE))
+        rows_seen = self.rows_seen
+        while True:
+            start = time.perf_counter()
+            batch = next(batches, None)
+            if batch is None:
+                return
+            rows_seen += len(batch["id_card"])
+
+            cards = []
+            for i, id_card in enumerate(batch["id_card"]):
+                if id_card not in self.known:
+                    self.known.add(id_card)
+                    cards.append(
+                        (id_card, batch["name"][i], batch["image"][i])
+                    )
+            self.stats.rows += len(batch["id_card"])
+            self.stats.read += time.perf_counter() - start
+            yield rows_seen, cards
+
+    def _consume(self, rows_seen: int, cards: list, future) -> None:
+        # Embed one preprocessed batch (in dataset order) and add it
+        import faiss
+
+        self.rows_seen = rows_seen
+        self.batches += 1
+
+        if cards:
+            try:
+                start = time.perf_counter()
+                pixel_values, decode_s, preprocess_s = future.result()
+                self.stats.wait += time.perf_counter() - start
+
+                start = time.perf_counter()
+                embeddings = embed_pixels(pixel_values)
+                self.stats.inference += time.perf_counter() - start
+            except Exception as e:
+                # Not recorded as indexed, the next run picks them up
+                self.failed += len(cards)
+                self.known.difference_update(card[0] for card in cards)
+                print(f"\nBatch error ({len(cards)} cards skipped) : {e}")
+            else:
+                if self.index is None:
+                    # Built flat, converted to INDEX_TYPE once complete
+                    self.index = faiss.IndexFlatIP(embeddings.shape[1])
+                self.index.add(embeddings)
+                # Store Name + ID
+                for id_card, name, _ in cards:
+                    self.metadata.append({"name": name, "id": id_card})
+                self.added += len(cards)
+                self.stats.images += len(cards)
+                self.stats.decode += decode_s
+                self.stats.preprocess += preprocess_s
+
+        print(f"Rows : {self.rows_seen}, new cards : {self.added}", end="\r")
+
+        if (
+            self.index is not None
+            and self.batches % self.checkpoint_every == 0
+        ):
+            save_checkpoint(
+                self.index,
+                self.metadata,
+                {"status": "in_progress", "rows_seen": self.rows_seen},
+            )
+
+    def _executor(self):
+        # Worker processes decode and preprocess, this process embeds.
+        # spawn: forking after torch / OpenMP start-up can deadlock
+        if self.workers > 0:
+            return ProcessPoolExecutor(
+                self.workers,
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=preprocess.init_worker,
+                initargs=(MODEL_NAME,),
+            )
+        preprocess.init_worker(MODEL_NAME)
+        return _InlineExecutor()
+
+    def run(self) -> dict:
+        print(f"Indexing cards ({self.workers} preprocessing workers)")
+        # Bounded prefetch: at most PREFETCH batches decoded ahead
+        pending = deque()
+        with self._executor() as executor:
+            for rows_seen, cards in self._read():
+                future = None
+                if cards:
+                    images = [image for _, _, image in cards]
+                    future = executor.submit(preprocess.preprocess, images)
+                pending.append((rows_seen, cards, future))
+                if len(pending) >= PREFETCH:
+                    self._consume(*pending.popleft())
+            while pending:
+                self._consume(*pending.popleft())
+
+        return {
+            "rows_seen": self.rows_seen,
+            "added": self.added,
+            "failed": self.failed,
+        }
+
+
+class _InlineExecutor:
+    # Executor stand-in running the work in this process (workers=0)
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def submit(self, func, *args) -> Future:
+        future = Future()
+        try:
+            future.set_result(func(*args))
+        except Exception as e:
+            future.set_exception(e)
+        return future
+
+
+def update_index(
+    checkpoint_every: int = CHECKPOINT_EVERY, workers: int = WORKERS
+) -> dict:
+    import faiss
+    from app.models import ann_index
+
+    build = _Build(checkpoint_every, workers)
+    result = build.run()
+    print(f"\nThroughput : {build.stats.report()}")
+
+    index = build.index
+    if index is None or index.ntotal == 0:
+        print("Error : Empty index. Check HF dataset")
+        return result
+
+    print(f"Saving index in : {DATA_DIR} ({result})")
+    save_checkpoint(index, build.metadata, dict(result, status="done"))
+
+    if (
+        isinstance(index, faiss.IndexFlat)
+        and ann_index.INDEX_TYPE != "flat"
+    ):
+        convert_index()
+    return result
+
+
+def build_index():
+    from app.models import ann_index
+
+    # Startup path: resume, convert, download or build from scratch
+    if load_state().get("status") == "in_progress":
+        update_index()
+        return
+
+    local_type = None
+    if os.path.exists(str(INDEX_FILE)):
+        local_type = ann_index.load_params(PARAMS_FILE)["index_type"]
+    resume = False
+    if local_type is not None and local_type != ann_index.INDEX_TYPE:
+        if local_type not in ann_index.LOSSY_TYPES:
+            convert_index()
+            return
+        print(
+            f"WARNING: the local {local_type} index keeps no exact "
+            f"vectors to convert to {ann_index.INDEX_TYPE}. Replacing it "
+            "with the published index and re-embedding the cards it lacks"
+        )
+        resume = True
+
+    if download_published():
+        if resume:
+            # Embed again the cards the local index had added, then
+            # update_index converts to INDEX_TYPE
+            update_index()
+        else:
+            convert_index()
+        return
+
+    discard_local()
+    update_index()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Update the card index")
+    parser.add_argument(
+        "--full", action="store_true", help="Re-embed the whole dataset"
+    )
+    parser.add_argument(
+        "--checkpoint-every", type=int, default=CHECKPOINT_EVERY
+    )
+    parser.add_argument("--workers", type=int, default=WORKERS)
+    args = parser.parse_args()
+
+    if args.full:
+        discard_local()
+    print(update_index(args.checkpoint_every, args.workers))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,123 @@
+import json
+import os
+import struct
+from pathlib import Path
+import numpy as np
+
+# File layout, everything little-endian:
+#   MAGIC | header length (uint32) | JSON header | padding to 8 bytes
+#   then per column: offsets (int64, count + 1) and UTF-8 blob.
+# Positions in the header are relative to the end of the padding.
+MAGIC = b"CVMETA1\n"
+COLUMNS = ("id", "name")
+
+
+def _align(size: int) -> int:
+    return (size + 7) // 8 * 8
+
+
+# Read-only card metadata indexed by FAISS row id. The file is
+# memory-mapped, so worker processes share its pages and a lookup
+# only decodes the strings it returns
+class CardMetadata:
+    def __init__(self, path: Path):
+        raw = np.memmap(str(path), dtype=np.uint8, mode="r")
+        if bytes(raw[: len(MAGIC)]) != MAGIC:
+            raise ValueError(f"{path} is not a card metadata file")
+
+        start = len(MAGIC)
+        (header_size,) = struct.unpack("<I", bytes(raw[start:start + 4]))
+        start += 4
+        header = json.loads(bytes(raw[start:start + header_size]))
+        base = _align(start + header_size)
+
+        self.count = header["count"]
+        self._columns = {}
+        for name, column in header["columns"].items():
+            offsets_at = base + column["offsets"]
+            data_at = base + column["data"]
+            offsets = raw[offsets_at:offsets_at + 8 * (self.count + 1)]
+            data = raw[data_at:data_at + column["size"]]
+            self._columns[name] = (offsets.view("<i8"), data)
+
+    def __len__(self) -> int:
+        return self.count
+
+    def value(self, column: str, row: int) -> str:
+        offsets, data = self._columns[column]
+        start, end = offsets[row], offsets[row + 1]
+        return bytes(data[start:end]).decode("utf-8")
+
+    def __getitem__(self, row) -> dict:
+        # Same shape as the old object array entries
+        row = int(row)
+        if row < 0:
+            row += self.count
+        if not 0 <= row < self.count:
+            raise IndexError(row)
+        return {column: self.value(column, row) for column in self._columns}
+
+    def __iter__(self):
+        for row in range(self.count):
+            yield self[row]
+
+    def column(self, name: str) -> list:
+        return [self.value(name, row) for row in range(self.count)]
+
+
+def write(path: Path, records: list) -> None:
+    # Serialise [{"id", "name"}, ...] and swap the file in atomically
+    header = {"count": len(records), "columns": {}}
+    chunks = []
+    position = 0
+    for column in COLUMNS:
+        values = [str(record.get(column) or "").encode() for record in records]
+        offsets = np.zeros(len(values) + 1, dtype="<i8")
+        np.cumsum([len(value) for value in values], out=offsets[1:])
+        data = b"".join(values)
+
+        header["columns"][column] = {
+            "offsets": position,
+            "data": position + offsets.nbytes,
+            "size": len(data),
+        }
+        # Keep the next offsets array 8-byte aligned
+        padding = _align(len(data)) - len(data)
+        chunks += [offsets.tobytes(), data, b"\0" * padding]
+        position += offsets.nbytes + len(data) + padding
+
+    header_bytes = json.dumps(header).encode()
+    prefix = MAGIC + struct.pack("<I", len(header_bytes)) + header_bytes
+    prefix += b"\0" * (_align(len(prefix)) - len(prefix))
+
+    tmp_path = path.with_name(path.name + ".tmp")
+    with open(str(tmp_path), "wb") as f:
+        f.write(prefix)
+        for chunk in chunks:
+            f.write(chunk)
+    os.replace(str(tmp_path), str(path))
+
+
+def migrate(npy_path: Path, path: Path) -> int:
+    # Convert the pickled object array (HF and older builds)
+    records = np.load(str(npy_path), allow_pickle=True)
+    write(path, list(records))
+    print(f"Migrated {len(records)} cards from {npy_path.name}")
+    return len(records)
+
+
+def load(path: Path, legacy_path: Path) -> CardMetadata:
+    # Older deployments only have the .npy, convert it once
+    if not os.path.exists(str(path)) and os.path.exists(str(legacy_path)):
+        migrate(legacy_path, path)
+    return CardMetadata(path)
+
+
+if __name__ == "__main__":
+    # python -m app.models.metadata_store [cards_metadata.npy] [out.bin]
+    import sys
+    from app.models.model import METADATA_FILE, NAMES_FILE
+
+    source = Path(sys.argv[1]) if len(sys.argv) > 1 else NAMES_FILE
+    target = Path(sys.argv[2]) if len(sys.argv) > 2 else METADATA_FILE
+    migrate(source, target)
@@ -1,15 +1,12 @@
 import io
 import os
-import faiss
-import requests
-import torch
+import threading
 import numpy as np
 from pathlib import Path
 from PIL import Image
-from fastapi import HTTPException
-from transformers import AutoImageProcessor, AutoModel
-from datasets import load_dataset
-from huggingface_hub import hf_hub_download
+
+# torch, transformers, faiss and datasets are imported where used: they
+# take seconds to import and are loaded during startup (see startup.py)
 
 # Configuration
 BASE_DIR = Path(__file__).parent.absolute()
@@ -17,150 +14,230 @@ MODEL_NAME = "facebook/dinov2-small"
 HF_DATASET_ID = "Franck-dev/CardVault"
 DATA_DIR = BASE_DIR / "data_cache"
 INDEX_FILE = DATA_DIR / "cards_index.faiss"
+# Legacy pickled metadata (HF download), migrated to METADATA_FILE
 NAMES_FILE = DATA_DIR / "cards_metadata.npy"
-BATCH_SIZE = 128
-BACKEND_URL = os.getenv("BACKEND_URL", "http://localhost:8000")
+METADATA_FILE = DATA_DIR / "cards_metadata.bin"
+# Index type and parameters the index on disk was built with
+PARAMS_FILE = DATA_DIR / "cards_index.json"
+# Number of matches returned per image
+TOP_K = 3
+BACKEND_URL = os.getenv("BACKEND_URL", "http://backend:8000")
+# Memory-map the index instead of copying it into each process
+FAISS_MMAP = os.getenv("FAISS_MMAP", "false").lower() == "true"
+# Dummy forward passes run before the service reports ready
+WARMUP_RUNS = int(os.getenv("WARMUP_RUNS", "2"))
+# torch, onnx or onnx-int8 (ONNX Runtime, see onnx_backend.py)
+INFERENCE_BACKEND = os.getenv("INFERENCE_BACKEND", "torch").lower()
+INFERENCE_BACKENDS = ("torch", "onnx", "onnx-int8")
+ONNX_DIR = DATA_DIR / "onnx"
+
+
+def import_libraries():
+    import torch  # noqa: F401
+    import faiss  # noqa: F401
+    import transformers  # noqa: F401
+    import datasets  # noqa: F401
+    import huggingface_hub  # noqa: F401
+
+    if INFERENCE_BACKEND != "torch":
+        import onnxruntime  # noqa: F401
+
+
+# Process-wide holder for the image processor and the encoder
+class ModelStore:
+    def __init__(self, backend: str = INFERENCE_BACKEND):
+        if backend not in INFERENCE_BACKENDS:
+            raise ValueError(
+                f"Unknown inference backend '{backend}', "
+                f"expected {INFERENCE_BACKENDS}"
+            )
+        self.backend = backend
+        self.processor = None
+        self.model = None
+        self.device = None
+        self._lock = threading.Lock()
+
+    def _load_torch(self):
+        import torch
+        from transformers import AutoModel
+
+        device = torch.device("cuda" if torch.cuda.is_available() else "cpu")
+        print(f"Loading {MODEL_NAME} on {device}")
+        model = AutoModel.from_pretrained(MODEL_NAME).to(device)
+        model.eval()
+        self.device = device
+        return model
+
+    def load(self):
+        from transformers import AutoImageProcessor
+        from app.models import onnx_backend
+
+        processor = AutoImageProcessor.from_pretrained(
+            MODEL_NAME, use_fast=True
+        )
+        if self.backend == "torch":
+            model = self._load_torch()
+        else:
+            print(f"Loading {MODEL_NAME} with ONNX Runtime ({self.backend})")
+            model = onnx_backend.load_encoder(
+                self.backend,
+                onnx_backend.model_paths(ONNX_DIR, MODEL_NAME),
+                self._load_torch,
+            )
+        self.processor, self.model = processor, model
+
+    def get(self):
+        if self.model is None:
+            with self._lock:
+                if self.model is None:
+                    self.load()
+        return self.processor, self.model, self.device
+
+    def encode(self, images: list) -> np.ndarray:
+        # Raw CLS embeddings for a batch of RGB images
+        processor, model, device = self.get()
+
+        if self.backend != "torch":
+            inputs = processor(images=images, return_tensors="np")
+            return model(inputs["pixel_values"])
+
+        import torch
+
+        inputs = processor(images=images, return_tensors="pt").to(device)
+        with torch.no_grad():
+            outputs = model(**inputs)
+            return outputs.last_hidden_state[:, 0, :].float().cpu().numpy()
 
-device = torch.device("cuda" if torch.cuda.is_available() else "cpu")
+    def encode_pixels(self, pixel_values: np.ndarray) -> np.ndarray:
+        # Same as encode, for batches already run through the processor
+        _, model, device = self.get()
 
-print(f"Loading {MODEL_NAME} on {device}")
-processor = AutoImageProcessor.from_pretrained(MODEL_NAME, use_fast=True)
-model = AutoModel.from_pretrained(MODEL_NAME).to(device)
-model.eval()
+        if self.backend != "torch":
+            return model(pixel_values)
 
+        import torch
 
-def build_index():
-    try:
-        print("Research index on HF")
-        hf_hub_download(
-            repo_id=HF_DATASET_ID,
-            filename="cards_index.faiss",
-            repo_type="dataset",
-            local_dir=str(DATA_DIR),
-        )
-        hf_hub_download(
-            repo_id=HF_DATASET_ID,
-            filename="cards_metadata.npy",
-            repo_type="dataset",
-            local_dir=str(DATA_DIR),
+        pixel_values = torch.from_numpy(pixel_values).to(device)
+        with torch.no_grad():
+            outputs = model(pixel_values=pixel_values)
+            return outputs.last_hidden_state[:, 0, :].float().cpu().numpy()
+
+
+model_store = ModelStore()
+
+
+# Process-wide holder keeping the index and metadata in memory
+class IndexStore:
+    def __init__(self):
+        self.index = None
+        self.metadata = None
+        self.version = None
+
+    def load(self):
+        import faiss
+        from app.models import ann_index, metadata_store
+
+        # Read the index and metadata from disk once
+        flags = 0
+        if FAISS_MMAP:
+            flags = faiss.IO_FLAG_MMAP_IFC | faiss.IO_FLAG_READ_ONLY
+        index = faiss.read_index(str(INDEX_FILE), flags)
+        params = ann_index.load_params(PARAMS_FILE)
+        params.update(ann_index.search_overrides(params["index_type"]))
+        ann_index.apply_search_params(index, params)
+        metadata = metadata_store.load(METADATA_FILE, NAMES_FILE)
+        self.index, self.metadata = index, metadata
+        # Changes whenever search results may change (cache keys)
+        self.version = (
+            f"{params['index_type']}:{index.ntotal}:"
+            f"{int(os.path.getmtime(str(INDEX_FILE)))}"
         )
-        print("Index loaded from HF")
-        return
-    except Exception as e:
-        print(f"No index found online ({e}). Building local index")
-
-    # Fallback if construction not found
-    ds = load_dataset(HF_DATASET_ID, split="train", streaming=True)
-
-    # Fetch dimension dynamicly
-    index = faiss.IndexFlatIP(model.config.hidden_size)
-    metadata = []
-    processed_count = 0
-
-    print("Indexing cards")
-    for batch in ds.iter(batch_size=BATCH_SIZE):
-        try:
-            images = [img.convert("RGB") for img in batch["image"]]
-            inputs = processor(images=images, return_tensors="pt").to(device)
-
-            with torch.no_grad():
-                outputs = model(**inputs)
-                embeddings = (
-                    outputs.last_hidden_state[:, 0, :].float().cpu().numpy()
-                )
-
-            embeddings = np.ascontiguousarray(embeddings.astype("float32"))
-            faiss.normalize_L2(embeddings)
-            index.add(embeddings)
-
-            # Store Name + ID
-            for name, id_card in zip(batch["name"], batch["id_card"]):
-                metadata.append({"name": name, "id": id_card})
-
-            processed_count += len(images)
-            print(f"Indexed cards : {processed_count}", end="\r")
-
-        except Exception as e:
-            print(f"\nBatch error : {e}")
-            continue
-
-    if index.ntotal == 0 or len(metadata) == 0:
-        print("\nError : Empty index. Check HF dataset")
-        return
-
-    print(f"\nSaving index in : {DATA_DIR}")
-    os.makedirs(str(DATA_DIR), exist_ok=True)
-    faiss.write_index(index, str(INDEX_FILE))
-    np.save(str(NAMES_FILE), np.array(metadata, dtype=object))
-
-
-def search_card(image_bytes: bytes):
-    try:
-        # If index doesn't exist, we build it
-        if not os.path.exists(str(INDEX_FILE)) or not os.path.exists(
-            str(NAMES_FILE)
-        ):
+
+    def ensure(self):
+        from app.models.index_build import build_index, needs_build
+
+        # Build, resume or convert the index (startup only, see get)
+        reason = needs_build()
+        if reason:
+            print(f"Building index: {reason}")
             build_index()
 
-        # Load index and names
-        index = faiss.read_index(str(INDEX_FILE))
-        metadata = np.load(str(NAMES_FILE), allow_pickle=True)
+        self.load()
 
-        if index.ntotal == 0 or len(metadata) == 0:
+        if self.index.ntotal == 0 or len(self.metadata) == 0:
             print("Empty index detected locally. Rebuilding...")
             build_index()
             # Reload after rebuild
-            index = faiss.read_index(str(INDEX_FILE))
-            metadata = np.load(str(NAMES_FILE), allow_pickle=True)
+            self.load()
 
-        # Prepare image to test
-        query_img = Image.open(io.BytesIO(image_bytes)).convert("RGB")
-        inputs = processor(images=query_img, return_tensors="pt").to(device)
+    def get(self):
+        # Requests never build the index, startup does it before ready
+        if self.index is None:
+            raise RuntimeError("Index is not loaded yet")
+        return self.index, self.metadata
 
-        with torch.no_grad():
-            outputs = model(**inputs)
-            query_emb = outputs.last_hidden_state[:, 0, :].cpu().numpy()
 
-        faiss.normalize_L2(query_emb)
+index_store = IndexStore()
+
+
+def embed_images(
+    images: list, store: ModelStore | None = None
+) -> np.ndarray:
+    import faiss
+
+    # CLS embeddings for a batch of RGB images, L2-normalised
+    embeddings = (store or model_store).encode(images)
+    embeddings = np.ascontiguousarray(embeddings.astype("float32"))
+    faiss.normalize_L2(embeddings)
+    return embeddings
 
-        # Get 3 best matches
-        scores, indices = index.search(query_emb, 3)
-        results = []
 
-        for i in range(3):
-            idx = indices[0][i]
+def embed_pixels(pixel_values: np.ndarray) -> np.ndarray:
+    import faiss
+
+    # embed_images for batches preprocessed elsewhere (index build)
+    embeddings = model_store.encode_pixels(pixel_values)
+    embeddings = np.ascontiguousarray(embeddings.astype("float32"))
+    faiss.normalize_L2(embeddings)
+    return embeddings
+
+
+def search_embeddings(embeddings: np.ndarray, k: int = TOP_K) -> list:
+    # One index search for a batch of normalised embeddings
+    index, metadata = index_store.get()
+    scores, indices = index.search(embeddings, k)
+
+    results = []
+    for row_scores, row_indices in zip(scores, indices):
+        matches = []
+        for i, (score, idx) in enumerate(zip(row_scores, row_indices)):
             if idx == -1:
                 print(f"#{i + 1} : No match found.")
                 continue
-            score = scores[0][i]
-            card_id = metadata[idx]["id"]
-
-            formatted_id = card_id.replace("-", "/")
-            url = f"http://backend:8000/api/search/pokemon/{formatted_id}"
-            try:
-                response = requests.get(url, timeout=2.0)
-                response.raise_for_status()
-                api_data = response.json()
-
-                results.append(
-                    {"score": round(float(score), 4), "data": api_data}
-                )
-
-            except requests.exceptions.RequestException as e:
-                print(f"API error for ID {card_id}: {e}")
-                results.append(
-                    {
-                        "score": float(score),
-                        "card_id": card_id,
-                        "error": "API Unreachable",
-                    }
-                )
-
-        return results
-
-    except Exception as e:
-        print(f"Search error: {type(e).__name__}: {e}")
-        import traceback
-
-        traceback.print_exc()
-        raise HTTPException(status_code=500, detail=str(e))
+            matches.append(
+                {"card_id": metadata.value("id", idx), "score": float(score)}
+            )
+        results.append(matches)
+    return results
+
+
+def match_embedded(images: list, k: int = TOP_K) -> tuple:
+    # Matches per image, plus the embeddings they were found with
+    embeddings = embed_images(images)
+    return search_embeddings(embeddings, k), embeddings
+
+
+def match_images(images: list, k: int = TOP_K) -> list:
+    # One forward pass and one index search for the whole batch
+    return match_embedded(images, k)[0]
+
+
+def warmup():
+    # First passes allocate buffers and pick kernels, pay for them here
+    blank = Image.new("RGB", (224, 224))
+    for _ in range(WARMUP_RUNS):
+        embed_images([blank])
+
+
+def load_image(image_bytes: bytes) -> Image.Image:
+    return Image.open(io.BytesIO(image_bytes)).convert("RGB")
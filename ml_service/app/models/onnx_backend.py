@@ -0,0 +1,98 @@
+import os
+from pathlib import Path
+import numpy as np
+
+# Needs the optional "onnx" extra (onnx, onnxruntime)
+ONNX_OPSET = int(os.getenv("ONNX_OPSET", "17"))
+# onnxruntime intra-op threads, 0 lets it pick one per core
+ONNX_THREADS = int(os.getenv("ONNX_THREADS", "0"))
+IMAGE_SIZE = 224
+
+
+def model_paths(onnx_dir: Path, model_name: str) -> dict:
+    stem = model_name.split("/")[-1]
+    return {
+        "onnx": onnx_dir / f"{stem}.onnx",
+        "onnx-int8": onnx_dir / f"{stem}.int8.onnx",
+    }
+
+
+def export(model, path: Path) -> None:
+    import torch
+
+    # Export only what search uses: the CLS token of the last layer
+    class ClsEncoder(torch.nn.Module):
+        def __init__(self, model):
+            super().__init__()
+            self.model = model
+
+        def forward(self, pixel_values):
+            outputs = self.model(pixel_values=pixel_values)
+            return outputs.last_hidden_state[:, 0, :]
+
+    encoder = ClsEncoder(model).to("cpu").eval()
+    dummy = torch.zeros(1, 3, IMAGE_SIZE, IMAGE_SIZE)
+    os.makedirs(str(path.parent), exist_ok=True)
+    tmp_path = path.with_suffix(".tmp")
+
+    print(f"Exporting ONNX model to {path}")
+    with torch.no_grad():
+        torch.onnx.export(
+            encoder,
+            (dummy,),
+            str(tmp_path),
+            input_names=["pixel_values"],
+            output_names=["cls"],
+            dynamic_axes={"pixel_values": {0: "batch"}, "cls": {0: "batch"}},
+            opset_version=ONNX_OPSET,
+            dynamo=False,
+        )
+    os.replace(str(tmp_path), str(path))
+
+
+def quantize(source: Path, path: Path) -> None:
+    from onnxruntime.quantization import QuantType, quantize_dynamic
+
+    # Dynamic int8: weights quantized offline, activations per batch.
+    # Only the transformer matmuls: the CPU provider has no int8 kernel
+    # for the patch embedding Conv
+    print(f"Quantizing ONNX model to {path}")
+    tmp_path = path.with_suffix(".tmp")
+    quantize_dynamic(
+        str(source),
+        str(tmp_path),
+        op_types_to_quantize=["MatMul", "Gemm"],
+        weight_type=QuantType.QInt8,
+    )
+    os.replace(str(tmp_path), str(path))
+
+
+# Runs the exported encoder, returning the same CLS embedding as torch
+class OnnxEncoder:
+    def __init__(self, path: Path):
+        import onnxruntime as ort
+
+        options = ort.SessionOptions()
+        options.graph_optimization_level = (
+            ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        )
+        if ONNX_THREADS > 0:
+            options.intra_op_num_threads = ONNX_THREADS
+        self.session = ort.InferenceSession(
+            str(path), options, providers=["CPUExecutionProvider"]
+        )
+
+    def __call__(self, pixel_values: np.ndarray) -> np.ndarray:
+        pixel_values = np.ascontiguousarray(pixel_values, dtype="float32")
+        return self.session.run(["cls"], {"pixel_values": pixel_values})[0]
+
+
+def load_encoder(backend: str, paths: dict, load_torch_model) -> OnnxEncoder:
+    # Export (and quantize) on first use, then reuse the files
+    if not os.path.exists(str(paths["onnx"])):
+        export(load_torch_model(), paths["onnx"])
+    if backend == "onnx-int8" and not os.path.exists(
+        str(paths["onnx-int8"])
+    ):
+        quantize(paths["onnx"], paths["onnx-int8"])
+    return OnnxEncoder(paths[backend])
@@ -0,0 +1,116 @@
+"""Check that an ONNX backend finds the same cards as PyTorch.
+
+Run from the ml_service directory, with the "onnx" extra installed:
+
+    python -m app.models.onnx_parity --backend onnx-int8 --images DIR
+
+Every image (a folder of held-out photos, or --samples rows of the
+HF dataset whose card is not in the local index) is embedded with
+both backends and searched in the local index. Indexed training
+images would match themselves and inflate agreement, so they are
+left out. The report gives the image source, top-1 agreement,
+embedding cosine similarity and per-batch latency. The exit code is
+1 when agreement is below --min-agreement, so the check can gate a
+backend switch.
+"""
+
+import argparse
+import json
+import sys
+import time
+from pathlib import Path
+import numpy as np
+from PIL import Image
+from app.models import model, preprocess
+
+IMAGE_SUFFIXES = {".jpg", ".jpeg", ".png", ".webp"}
+
+
+def load_images(args, indexed: set) -> tuple:
+    # (images, where they come from)
+    if args.images:
+        paths = sorted(
+            p
+            for p in Path(args.images).iterdir()
+            if p.suffix.lower() in IMAGE_SUFFIXES
+        )
+        return [Image.open(p).convert("RGB") for p in paths], "images"
+
+    from datasets import Image as ImageFeature, load_dataset
+
+    ds = load_dataset(model.HF_DATASET_ID, split="train", streaming=True)
+    # Only decode the rows that are kept
+    ds = ds.cast_column("image", ImageFeature(decode=False))
+    images = []
+    for row in ds.skip(args.offset):
+        if row["id_card"] in indexed:
+            continue
+        images.append(preprocess.decode(row["image"]))
+        if len(images) == args.samples:
+            break
+    return images, "dataset rows not in the index"
+
+
+def embed_all(store, images: list, batch_size: int):
+    # Embeddings for every image, plus seconds spent per batch
+    chunks, timings = [], []
+    store.get()
+    model.embed_images(images[:1], store)
+    for i in range(0, len(images), batch_size):
+        start = time.perf_counter()
+        chunks.append(model.embed_images(images[i:i + batch_size], store))
+        timings.append(time.perf_counter() - start)
+    return np.concatenate(chunks), timings
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="ONNX parity check")
+    parser.add_argument(
+        "--backend", choices=["onnx", "onnx-int8"], default="onnx-int8"
+    )
+    parser.add_argument("--images", help="Folder of held-out images")
+    parser.add_argument("--samples", type=int, default=200)
+    parser.add_argument("--offset", type=int, default=0)
+    parser.add_argument("--batch-size", type=int, default=16)
+    parser.add_argument("--min-agreement", type=float, default=0.99)
+    args = parser.parse_args()
+
+    model.index_store.load()
+    index = model.index_store.index
+
+    indexed = set(model.index_store.metadata.column("id"))
+    images, source = load_images(args, indexed)
+    if not images:
+        sys.exit("No held-out images to compare, pass --images")
+
+    results = {"source": source}
+    top1 = {}
+    embeddings = {}
+    for backend in ("torch", args.backend):
+        store = model.ModelStore(backend)
+        embeddings[backend], timings = embed_all(
+            store, images, args.batch_size
+        )
+        _, indices = index.search(embeddings[backend], 1)
+        top1[backend] = indices[:, 0]
+        results[f"{backend}_ms_per_batch"] = round(
+            1000 * float(np.mean(timings)), 2
+        )
+
+    cosine = np.sum(embeddings["torch"] * embeddings[args.backend], axis=1)
+    agreement = float(np.mean(top1["torch"] == top1[args.backend]))
+    results.update(
+        images=len(images),
+        top1_agreement=round(agreement, 4),
+        cosine_mean=round(float(cosine.mean()), 5),
+        cosine_min=round(float(cosine.min()), 5),
+    )
+    print(json.dumps(results, indent=2))
+
+    if agreement < args.min_agreement:
+        print(f"Top-1 agreement below {args.min_agreement}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,271 @@
+import base64
+import hashlib
+import json
+import os
+from collections import OrderedDict
+import numpy as np
+from starlette.concurrency import run_in_threadpool
+from app.models import model
+
+PREDICT_CACHE_ENABLED = (
+    os.getenv("PREDICT_CACHE_ENABLED", "true").lower() == "true"
+)
+# Memory budget of the in-process LRU
+PREDICT_CACHE_MAX_BYTES = int(
+    os.getenv("PREDICT_CACHE_MAX_BYTES", str(64 * 1024 * 1024))
+)
+# Perceptual hash lookup for near-identical frames (retries, rescans)
+PREDICT_CACHE_PHASH = (
+    os.getenv("PREDICT_CACHE_PHASH", "false").lower() == "true"
+)
+PREDICT_CACHE_PHASH_DISTANCE = int(
+    os.getenv("PREDICT_CACHE_PHASH_DISTANCE", "2")
+)
+# Optional second level shared by every worker and replica
+PREDICT_CACHE_REDIS = (
+    os.getenv("PREDICT_CACHE_REDIS", "false").lower() == "true"
+)
+REDIS_URL = os.getenv("REDIS_URL", "redis://redis:6379/0")
+# Seconds before a Redis call gives up and the model answers instead
+PREDICT_CACHE_REDIS_TIMEOUT = float(
+    os.getenv("PREDICT_CACHE_REDIS_TIMEOUT", "0.5")
+)
+PREDICT_CACHE_REDIS_CONNECT_TIMEOUT = float(
+    os.getenv("PREDICT_CACHE_REDIS_CONNECT_TIMEOUT", "0.5")
+)
+PREDICT_CACHE_TTL = int(os.getenv("PREDICT_CACHE_TTL", "86400"))
+
+# Rough per-entry overhead besides the embedding (dicts, keys, ids)
+ENTRY_OVERHEAD = 512
+
+
+def content_key(data: bytes) -> str:
+    return hashlib.sha256(data).hexdigest()
+
+
+def dhash(image, size: int = 8) -> int:
+    # 64-bit difference hash: brighter-than-right-neighbour bits
+    pixels = np.asarray(
+        image.convert("L").resize((size + 1, size)), dtype=np.int16
+    )
+    bits = (pixels[:, 1:] > pixels[:, :-1]).flatten()
+    return int("".join("1" if bit else "0" for bit in bits), 2)
+
+
+# Embedding and top-k matches per image, keyed by content hash
+class PredictCache:
+    def __init__(
+        self,
+        max_bytes: int = PREDICT_CACHE_MAX_BYTES,
+        phash: bool = PREDICT_CACHE_PHASH,
+        phash_distance: int = PREDICT_CACHE_PHASH_DISTANCE,
+    ):
+        self.enabled = PREDICT_CACHE_ENABLED
+        self.max_bytes = max_bytes
+        self.phash = phash
+        self.phash_distance = phash_distance
+        self._entries: OrderedDict[str, dict] = OrderedDict()
+        self._phashes: dict[int, str] = {}
+        self._redis = None
+        self.bytes = 0
+        self.hits = 0
+        self.similar_hits = 0
+        self.redis_hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.researches = 0
+
+    def open(self):
+        if not (self.enabled and PREDICT_CACHE_REDIS):
+            return
+        try:
+            import redis.asyncio as redis
+        except ImportError:
+            print("PREDICT_CACHE_REDIS needs the redis package, skipping")
+            return
+        self._redis = redis.from_url(
+            REDIS_URL,
+            socket_timeout=PREDICT_CACHE_REDIS_TIMEOUT,
+            socket_connect_timeout=PREDICT_CACHE_REDIS_CONNECT_TIMEOUT,
+        )
+
+    async def close(self):
+        if self._redis is not None:
+            await self._redis.aclose()
+            self._redis = None
+
+    def _redis_key(self, key: str) -> str:
+        # Embeddings differ between backends (int8 vs float)
+        return f"predict:v1:{model.INFERENCE_BACKEND}:{key}"
+
+    # ---------- Lookups ---------- #
+
+    async def get(self, key: str) -> dict | None:
+        if not self.enabled:
+            return None
+
+        entry = self._entries.get(key)
+        if entry is not None:
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry
+
+        entry = await self._redis_get(key)
+        if entry is not None:
+            self.redis_hits += 1
+            self._store(key, entry)
+            return entry
+        return None
+
+    def get_similar(self, phash: int) -> dict | None:
+        # Nearest cached frame within the Hamming distance, if any
+        if not self.enabled or not self.phash:
+            return None
+
+        key = self._phashes.get(phash)
+        if key is None and self.phash_distance > 0:
+            for other, other_key in self._phashes.items():
+                if (phash ^ other).bit_count() <= self.phash_distance:
+                    key = other_key
+                    break
+        if key is None or key not in self._entries:
+            return None
+
+        self._entries.move_to_end(key)
+        self.similar_hits += 1
+        return self._entries[key]
+
+    def miss(self):
+        self.misses += 1
+
+    async def matches(self, entry: dict) -> list:
+        # Cached matches, searched again if the index changed since
+        version = model.index_store.version
+        if entry["index_version"] != version:
+            results = await run_in_threadpool(
+                model.search_embeddings, entry["embedding"][None, :]
+            )
+            entry["matches"], entry["index_version"] = results[0], version
+            self.researches += 1
+        return entry["matches"]
+
+    # ---------- Storage ---------- #
+
+    async def put(
+        self,
+        key: str,
+        embedding: np.ndarray,
+        matches: list,
+        phash: int | None = None,
+    ) -> None:
+        if not self.enabled:
+            return
+        entry = {
+            # Own copy: a row view would keep the whole batch alive and
+            # escape the byte accounting below
+            "embedding": np.array(embedding, dtype="float32", copy=True),
+            "matches": matches,
+            "index_version": model.index_store.version,
+            "phash": phash,
+        }
+        self._store(key, entry)
+        await self._redis_set(key, entry)
+
+    def _store(self, key: str, entry: dict) -> None:
+        if key in self._entries:
+            self._drop(key)
+
+        entry["size"] = entry["embedding"].nbytes + ENTRY_OVERHEAD
+        self._entries[key] = entry
+        self.bytes += entry["size"]
+        if entry.get("phash") is not None:
+            self._phashes[entry["phash"]] = key
+
+        # Evict least recently used entries until under budget
+        while self.bytes > self.max_bytes and len(self._entries) > 1:
+            self._drop(next(iter(self._entries)))
+            self.evictions += 1
+
+    def _drop(self, key: str) -> None:
+        entry = self._entries.pop(key)
+        self.bytes -= entry["size"]
+        if self._phashes.get(entry.get("phash")) == key:
+            del self._phashes[entry["phash"]]
+
+    async def _redis_get(self, key: str) -> dict | None:
+        if self._redis is None:
+            return None
+        try:
+            raw = await self._redis.get(self._redis_key(key))
+        except Exception as e:
+            print(f"Predict cache Redis read failed: {e}")
+            return None
+        if raw is None:
+            return None
+
+        # Corrupt or older-format entries are a miss and get dropped
+        try:
+            data = json.loads(raw)
+            embedding = np.frombuffer(
+                base64.b64decode(data["embedding"], validate=True),
+                dtype="float32",
+            )
+            index = model.index_store.index
+            if not embedding.size or (
+                index is not None and embedding.size != index.d
+            ):
+                raise ValueError(f"embedding of size {embedding.size}")
+            return {
+                "embedding": embedding,
+                "matches": data["matches"],
+                "index_version": data["index_version"],
+                "phash": data.get("phash"),
+            }
+        except (ValueError, TypeError, KeyError) as e:
+            print(f"Predict cache dropping unreadable entry: {e}")
+        try:
+            await self._redis.delete(self._redis_key(key))
+        except Exception as e:
+            print(f"Predict cache Redis delete failed: {e}")
+        return None
+
+    async def _redis_set(self, key: str, entry: dict) -> None:
+        if self._redis is None:
+            return
+        raw = json.dumps(
+            {
+                "embedding": base64.b64encode(
+                    entry["embedding"].tobytes()
+                ).decode(),
+                "matches": entry["matches"],
+                "index_version": entry["index_version"],
+                "phash": entry["phash"],
+            }
+        )
+        try:
+            await self._redis.set(
+                self._redis_key(key), raw, ex=PREDICT_CACHE_TTL
+            )
+        except Exception as e:
+            print(f"Predict cache Redis write failed: {e}")
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.similar_hits + self.redis_hits
+        total = lookups + self.misses
+        return {
+            "enabled": self.enabled,
+            "hits": self.hits,
+            "similar_hits": self.similar_hits,
+            "redis_hits": self.redis_hits,
+            "misses": self.misses,
+            "hit_rate": round(lookups / total, 4) if total else None,
+            "entries": len(self._entries),
+            "bytes": self.bytes,
+            "max_bytes": self.max_bytes,
+            "evictions": self.evictions,
+            "researches": self.researches,
+            "redis": self._redis is not None,
+        }
+
+
+predict_cache = PredictCache()
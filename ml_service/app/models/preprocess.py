@@ -0,0 +1,35 @@
+import io
+import time
+import numpy as np
+from PIL import Image
+
+# Worker-side image processor, loaded once per process by init_worker
+_processor = None
+
+
+def init_worker(model_name: str) -> None:
+    global _processor
+    from transformers import AutoImageProcessor
+
+    _processor = AutoImageProcessor.from_pretrained(model_name, use_fast=True)
+
+
+def decode(image: dict) -> Image.Image:
+    # Undecoded dataset image: raw bytes, or a path for local files
+    if image.get("bytes"):
+        return Image.open(io.BytesIO(image["bytes"])).convert("RGB")
+    return Image.open(image["path"]).convert("RGB")
+
+
+def preprocess(images: list) -> tuple:
+    # Decode and preprocess one batch into model-ready pixel values,
+    # with the seconds spent in each of the two stages
+    start = time.perf_counter()
+    decoded = [decode(image) for image in images]
+    decoded_at = time.perf_counter()
+    pixel_values = _processor(images=decoded, return_tensors="np")[
+        "pixel_values"
+    ]
+    pixel_values = np.ascontiguousarray(pixel_values, dtype="float32")
+    done_at = time.perf_counter()
+    return pixel_values, decoded_at - start, done_at - decoded_at
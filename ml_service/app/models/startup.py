@@ -0,0 +1,60 @@
+import time
+from PIL import Image
+from app.models import model
+
+# Startup phases, in the order they are reached
+PHASES = ("starting", "import", "model_load", "warmup", "index_ready")
+
+
+# Tracks how far the service got loading the model and the index
+class Startup:
+    def __init__(self):
+        self.phase = "starting"
+        self.error = None
+        self.timings = {}
+        self._started_at = time.monotonic()
+
+    @property
+    def ready(self) -> bool:
+        return self.phase == PHASES[-1]
+
+    def _step(self, phase: str, func) -> None:
+        start = time.monotonic()
+        func()
+        self.timings[phase] = round(time.monotonic() - start, 3)
+        self.phase = phase
+        print(f"Startup: {phase} in {self.timings[phase]}s")
+
+    def _load_index(self) -> None:
+        # Built here when missing, so no request ever pays for it
+        model.index_store.ensure()
+        # Touch the index (and mmapped pages) with a first search
+        model.match_images([Image.new("RGB", (224, 224))])
+
+    def run(self) -> None:
+        # Blocking, meant to run in a worker thread
+        try:
+            self._step("import", model.import_libraries)
+            self._step("model_load", model.model_store.get)
+            self._step("warmup", model.warmup)
+            self._step("index_ready", self._load_index)
+        except Exception as e:
+            self.error = f"{type(e).__name__}: {e}"
+            print(f"Startup failed during {self.next_phase()}: {self.error}")
+
+    def next_phase(self) -> str | None:
+        index = PHASES.index(self.phase) + 1
+        return PHASES[index] if index < len(PHASES) else None
+
+    def status(self) -> dict:
+        return {
+            "ready": self.ready,
+            "phase": self.phase,
+            "next_phase": self.next_phase(),
+            "error": self.error,
+            "timings": self.timings,
+            "uptime": round(time.monotonic() - self._started_at, 3),
+        }
+
+
+startup = Startup()
@@ -1,6 +1,30 @@
+import asyncio
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from starlette.concurrency import run_in_threadpool
 from app.api.v1.predict import router as predict_router
+from app.api.v1.ready import router as ready_router
+from app.models.batcher import batcher
+from app.models.enrichment import enricher
+from app.models.predict_cache import predict_cache
+from app.models.startup import startup
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Load libraries, model and index in the background so the server
+    # answers /ready right away; predictions wait for "index_ready"
+    app.state.startup_task = asyncio.create_task(
+        run_in_threadpool(startup.run)
+    )
+    batcher.start()
+    enricher.open()
+    predict_cache.open()
+    yield
+    await batcher.stop()
+    await enricher.close()
+    await predict_cache.close()
 
 
 def create_app() -> FastAPI:
@@ -10,6 +34,7 @@ def create_app() -> FastAPI:
         version="1.0.0",
         docs_url="/api/v1/docs",
         redoc_url=None,
+        lifespan=lifespan,
     )
 
     # CORS Configuration
@@ -23,6 +48,8 @@ def create_app() -> FastAPI:
 
     # Include Routers
     app.include_router(predict_router, prefix="/ml/api/v1")
+    app.include_router(ready_router)
+    app.include_router(ready_router, prefix="/ml/api/v1")
 
     return app
 